@@ -0,0 +1,278 @@
+"""Бенчмарк масштабирования: синтетический парк роботов и замер основных операций.
+
+Примеры:
+    python bench.py --backend sqlite --rows 1000 10000 100000
+    python bench.py --backend postgres --pg-host localhost --pg-dbname robots_bench
+    python bench.py --backend sqlite --compare bench_results_old.json
+
+Каждый размер выполняется в отдельном процессе, чтобы пиковый RSS не
+накапливался между прогонами. Результаты пишутся в JSON (--output).
+Внимание: для postgres таблица robots в указанной базе очищается вместе
+с историей статусов и сводками.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SAVE_EDITED_CELLS = 10
+REGRESSION_THRESHOLD = 1.2
+
+MODEL_WEIGHTS = {"RC3": 3, "RC5": 5, "RC10": 2}
+STATUS_WEIGHTS = {
+    "Необходим ремонт": 2, "Тестируется": 3, "Протестирован": 3,
+    "Откалиброван": 2, "Упакован": 5, "-": 1
+}
+FAULT_PHRASES = [
+    "Ошибка энкодера оси {axis} при выходе в исходную позицию",
+    "Перегрев привода оси {axis} после {minutes} минут цикла",
+    "Люфт в редукторе оси {axis}, слышен стук при реверсе",
+    "Не проходит калибровку нуля, отклонение {deviation} мм",
+    "Обрыв связи с контроллером по EtherCAT каждые {minutes} минут",
+    "Сработка защиты по току на оси {axis}",
+    "Повреждён кабель в кабельном канале у основания",
+]
+MODULES = ["Привод оси {axis}", "Редуктор оси {axis}", "Контроллер", "Кабельный жгут", "Тормоз оси {axis}"]
+REASONS = ["Износ подшипника", "Заводской брак", "Нарушение условий транспортировки",
+           "Ошибка сборки", "Попадание влаги", "Причина не установлена"]
+TASKS = ["Замена энкодера", "Перепрошивка контроллера", "Протяжка крепежа", "Замена кабеля",
+         "Калибровка нуля", "Прогон теста 24 часа", "Замена смазки редуктора"]
+PARTS = ["Энкодер 17 бит", "Кабель силовой 5 м", "Редуктор RV-20E", "Плата ввода-вывода",
+         "Подшипник 6204", "Тормоз 24 В"]
+
+
+# 🏭 Синтетический парк роботов
+def _fill(template, rng):
+    return template.format(axis=rng.randint(1, 6), minutes=rng.randint(5, 120),
+                           deviation=round(rng.uniform(0.1, 3.0), 2))
+
+
+def generate_fleet(count, seed=0):
+    rng = random.Random(seed)
+    models = list(MODEL_WEIGHTS)
+    statuses = list(STATUS_WEIGHTS)
+    for number in range(count):
+        model = rng.choices(models, weights=MODEL_WEIGHTS.values())[0]
+        status = rng.choices(statuses, weights=STATUS_WEIGHTS.values())[0]
+        robot = {
+            "model": model,
+            "robot_sn": f"{model}-{2020 + number % 6}{number:07d}",
+            "controller_sn": f"CB{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+            "status": status,
+            "fault_description": "", "fault_module": "", "fault_reason": "",
+            "tasks_done": "", "tasks_required": "", "required_parts": "",
+        }
+        if status in ("Необходим ремонт", "Тестируется") or rng.random() < 0.2:
+            robot["fault_description"] = ". ".join(
+                _fill(rng.choice(FAULT_PHRASES), rng) for _ in range(rng.randint(2, 8)))
+            robot["fault_module"] = _fill(rng.choice(MODULES), rng)
+            robot["fault_reason"] = rng.choice(REASONS)
+            robot["tasks_done"] = "; ".join(rng.sample(TASKS, rng.randint(0, 3)))
+            robot["tasks_required"] = "; ".join(rng.sample(TASKS, rng.randint(1, 3)))
+            robot["required_parts"] = ", ".join(rng.sample(PARTS, rng.randint(0, 3)))
+        yield robot
+
+
+# 🔌 Подготовка выбранной реализации db до импорта интерфейса
+def _install_backend(args, workdir):
+    os.environ["ROBOTS_SNAPSHOT_PATH"] = os.path.join(workdir, "snapshot.sqlite3")
+    if args.backend == "sqlite":
+        os.environ["ROBOTS_SQLITE_PATH"] = os.path.join(workdir, "robots.sqlite3")
+        import sqlite_db
+        sys.modules["db"] = sqlite_db
+        sqlite_db.init_db()
+        return sqlite_db
+
+    import db
+    db.DB_CONFIG.update(host=args.pg_host, port=args.pg_port, dbname=args.pg_dbname,
+                        user=args.pg_user, password=args.pg_password)
+    db.init_db()
+    db.reset_for_bench()
+    return db
+
+
+def _seed(db, count):
+    fields = list(db.EDITABLE_FIELDS)
+    rows = ((number, *[robot[field] for field in fields])
+            for number, robot in enumerate(generate_fleet(count), start=2))
+    db.bulk_upsert_robots(rows, fields)
+
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_child(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    workdir = tempfile.mkdtemp(prefix="robots_bench_")
+    db = _install_backend(args, workdir)
+    _seed(db, args.child)
+
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    app = QApplication(sys.argv)
+    import ui
+
+    # Диалоги подтверждения в бенчмарке всегда отвечают «Да» и не блокируют цикл событий
+    class _AutoMessageBox(QMessageBox):
+        question = staticmethod(lambda *a, **k: QMessageBox.Yes)
+        information = staticmethod(lambda *a, **k: QMessageBox.Ok)
+        warning = staticmethod(lambda *a, **k: QMessageBox.Ok)
+    ui.QMessageBox = _AutoMessageBox
+
+    from table_model import DB_FIELDS
+    window = None
+    results = []
+
+    def wait_idle():
+        # Ждём и фоновые задачи (сводка, подписка), чтобы они не попали в следующий замер
+        while window is not None and not window.executor.is_idle():
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+
+    def measure(operation, action):
+        wait_idle()
+        round_trips = db.round_trip_count()
+        started = time.perf_counter()
+        action()
+        wait_idle()
+        results.append({
+            "rows": args.child,
+            "operation": operation,
+            "seconds": round(time.perf_counter() - started, 6),
+            "peak_rss_kb": _peak_rss_kb(),
+            "round_trips": db.round_trip_count() - round_trips,
+        })
+
+    def open_window():
+        nonlocal window
+        window = ui.RobotTable()
+        # Синхронизация по NOTIFY (в том числе от собственного сохранения) запускалась
+        # бы по таймеру посреди следующих замеров
+        window.listener.changed.disconnect()
+
+    measure("get_all_robots", db.get_all_robots)
+    # Первый запуск: снимок пуст, полная выборка с сервера
+    measure("load_data_cold", open_window)
+    window.listener.stop()
+    window.sync_timer.stop()
+    wait_idle()
+    # Повторная загрузка: снимок с диска и пустая дельта
+    measure("load_data_warm", window.load_data)
+
+    def filter_now():
+        # Смена полей запускает отложенный поиск; здесь он вызывается сразу,
+        # а таймер останавливается, чтобы поиск не сработал во время следующего замера
+        window.filter_table()
+        window.search_timer.stop()
+
+    def filter_text():
+        window.search_input.setText("энкодер")
+        filter_now()
+
+    def filter_status():
+        window.search_input.setText("")
+        window.status_filter.setCurrentIndex(1)
+        filter_now()
+    measure("filter_table_text", filter_text)
+    measure("filter_table_status", filter_status)
+    window.status_filter.setCurrentIndex(0)
+    filter_now()
+
+    def save():
+        rng = random.Random(1)
+        column = DB_FIELDS.index("tasks_done")
+        for _ in range(min(SAVE_EDITED_CELLS, window.model.rowCount())):
+            index = window.model.index(rng.randrange(window.model.rowCount()), column)
+            window.model.setData(index, f"Правка бенчмарка {rng.random()}")
+        window.save_changes()
+    measure("save_changes", save)
+
+    for extension in ("xlsx", "csv"):
+        path = os.path.join(workdir, f"export.{extension}")
+        measure(f"export_to_excel_{extension}", lambda: window.start_export(path))
+
+    window.close()
+    json.dump(results, sys.stdout)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(item["rows"], item["operation"]): item for item in json.load(file)["results"]}
+    regressions = 0
+    print(f"\nСравнение с {baseline_path}:")
+    for item in results:
+        old = baseline.get((item["rows"], item["operation"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = item["seconds"] / old["seconds"]
+        mark = "  ⚠️ регрессия" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += bool(mark)
+        print(f"{item['rows']:>8} {item['operation']:<24} x{ratio:5.2f}"
+              f"  обращений {old['round_trips']} -> {item['round_trips']}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк приложения учёта роботов ОТК")
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для поиска регрессий")
+    parser.add_argument("--pg-host", default="localhost")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--pg-dbname", default="robots_bench")
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--pg-password", default="admin")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _run_child(args)
+        return
+
+    results = []
+    for count in args.rows:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--child", str(count),
+            "--backend", args.backend, "--pg-host", args.pg_host, "--pg-port", str(args.pg_port),
+            "--pg-dbname", args.pg_dbname, "--pg-user", args.pg_user, "--pg-password", args.pg_password,
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        size_results = json.loads(completed.stdout.strip().splitlines()[-1])
+        for item in size_results:
+            print(f"{item['rows']:>8} {item['operation']:<24} {item['seconds']:9.3f} с"
+                  f"  RSS {item['peak_rss_kb'] // 1024:>5} МБ  обращений {item['round_trips']}")
+        results.extend(size_results)
+
+    report = {
+        "revision": _git_revision(),
+        "backend": args.backend,
+        "python": sys.version.split()[0],
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+    if args.compare and _compare(results, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+
+from db import get_robots_since, get_lookups, EDITABLE_FIELDS
+
+# 💾 Локальный снимок таблицы robots: окно открывается сразу, без ожидания сервера
+SNAPSHOT_PATH = os.environ.get(
+    "ROBOTS_SNAPSHOT_PATH",
+    os.path.join(os.path.expanduser("~"), ".robot_otk", "snapshot.sqlite3")
+)
+
+_COLUMNS = ("id", "row_version") + EDITABLE_FIELDS
+
+
+def _connect():
+    os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
+    conn = sqlite3.connect(SNAPSHOT_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS robots (
+            id INTEGER PRIMARY KEY,
+            row_version INTEGER NOT NULL,
+            {", ".join(f"{field} TEXT" for field in EDITABLE_FIELDS)}
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """)
+    return conn
+
+
+# Отметка синхронизации из get_robots_since. Прежний ключ 'version' (максимальная
+# row_version) не читается: такой снимок показывается, но затем загружается заново
+def _get_watermark(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+    return int(row["value"]) if row else 0
+
+
+def _set_watermark(conn, watermark):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (str(watermark),))
+
+
+def _upsert(conn, robots):
+    placeholders = ", ".join("?" for _ in _COLUMNS)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO robots ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+        ([robot.get(column) for column in _COLUMNS] for robot in robots)
+    )
+
+
+def load_snapshot():
+    """Возвращает (роботы, отметка синхронизации, справочники или None). Пустой снимок — ([], 0, None)."""
+    conn = _connect()
+    try:
+        robots = [dict(row) for row in conn.execute("SELECT * FROM robots ORDER BY id")]
+        row = conn.execute("SELECT value FROM meta WHERE key = 'lookups'").fetchone()
+        lookups = json.loads(row["value"]) if row else None
+        return robots, _get_watermark(conn), lookups
+    finally:
+        conn.close()
+
+
+def save_lookups(lookups):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lookups', ?)",
+                         (json.dumps(lookups, ensure_ascii=False),))
+    finally:
+        conn.close()
+
+
+def save_snapshot(robots, watermark):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM robots")
+            _upsert(conn, robots)
+            _set_watermark(conn, watermark)
+    finally:
+        conn.close()
+
+
+def apply_snapshot_delta(robots, watermark):
+    conn = _connect()
+    try:
+        with conn:
+            deleted = [(robot["id"],) for robot in robots if robot.get("deleted")]
+            _upsert(conn, [robot for robot in robots if not robot.get("deleted")])
+            conn.executemany("DELETE FROM robots WHERE id = ?", deleted)
+            _set_watermark(conn, watermark)
+    finally:
+        conn.close()
+
+
+# 🔄 Запрос к серверу с сохранением результата в снимок (выполняются в фоновом потоке)
+def fetch_all_robots():
+    robots, watermark = get_robots_since(None)
+    save_snapshot(robots, watermark)
+    return robots, watermark
+
+
+def fetch_lookups():
+    lookups = get_lookups()
+    save_lookups(lookups)
+    return lookups
+
+
+def fetch_robots_since(watermark):
+    robots, new_watermark = get_robots_since(watermark)
+    apply_snapshot_delta(robots, new_watermark)
+    return robots, new_watermark
@@ -0,0 +1,26 @@
+# 📋 Общие константы схемы без зависимостей от Qt и драйвера БД:
+# их используют db.py (миграции), sqlite_db.py и интерфейс
+
+# Поля, которые можно менять из интерфейса, в порядке колонок таблицы
+EDITABLE_FIELDS = (
+    "model", "robot_sn", "controller_sn", "status",
+    "fault_description", "fault_module", "fault_reason",
+    "tasks_done", "tasks_required", "required_parts"
+)
+
+# Выражение, по которому строится триграммный индекс поиска.
+# В запросах оно должно совпадать с индексным дословно, иначе индекс не используется.
+SEARCH_EXPRESSION = "(" + " || ' ' || ".join(f"coalesce({field}, '')" for field in EDITABLE_FIELDS) + ")"
+
+# Справочники по умолчанию: начальное заполнение robot_models/robot_statuses (миграция 4)
+# и значения интерфейса до первой загрузки справочников с сервера. В уже созданных
+# базах правка здесь ничего не меняет — справочники меняются новой миграцией
+DEFAULT_MODELS = ["RC3", "RC5", "RC10", "-"]
+DEFAULT_STATUSES = [
+    ("Необходим ремонт", "#ffcccc"),   # светло-красный
+    ("Тестируется", "#ffffcc"),        # светло-жёлтый
+    ("Протестирован", "#ccffff"),      # светло-голубой
+    ("Откалиброван", "#ccffcc"),       # светло-зелёный
+    ("Упакован", "#e0e0e0"),           # серый
+    ("-", "#ffffff"),                  # белый
+]
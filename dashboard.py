@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from table_model import MODELS, STATUSES, STATUS_COLORS
+
+# За сколько последних дней показывать переходы в статус
+DASHBOARD_DAYS = 7
+
+
+def _make_table():
+    table = QTableWidget()
+    table.setEditTriggers(QTableWidget.NoEditTriggers)
+    table.setSelectionMode(QTableWidget.NoSelection)
+    table.setFocusPolicy(Qt.NoFocus)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    return table
+
+
+def _fit_height(table):
+    # Высота по содержимому: панель не отнимает место у основной таблицы
+    height = table.horizontalHeader().height() + 2 * table.frameWidth()
+    height += sum(table.rowHeight(row) for row in range(table.rowCount()))
+    table.setFixedHeight(height)
+
+
+def _item(text, color=None):
+    item = QTableWidgetItem(text)
+    item.setTextAlignment(Qt.AlignCenter)
+    if color is not None:
+        item.setBackground(QBrush(QColor(color)))
+    return item
+
+
+# 📈 Панель показателей: роботы по моделям и статусам и переходы в статус по дням
+class DashboardPanel(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title = QLabel("Сводка: всего роботов (+ переведено в статус сегодня)")
+        self.table = _make_table()
+        self.daily_title = QLabel(f"Переходы в статус за {DASHBOARD_DAYS} дней")
+        self.daily_table = _make_table()
+
+        counts_layout = QVBoxLayout()
+        counts_layout.addWidget(self.title)
+        counts_layout.addWidget(self.table)
+        daily_layout = QVBoxLayout()
+        daily_layout.addWidget(self.daily_title)
+        daily_layout.addWidget(self.daily_table)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(counts_layout, 3)
+        layout.addLayout(daily_layout, 2)
+        self.setLayout(layout)
+        self._summary = {"counts": [], "daily": []}
+        self.set_summary(self._summary)
+
+    def set_summary(self, summary):
+        self._summary = summary
+        counts = {(model, status): value for model, status, value in summary["counts"]}
+        today = date.today()
+        moved_today = {}
+        moved_by_day = {}
+        for day, model, status, value in summary["daily"]:
+            if day == today:
+                moved_today[(model, status)] = moved_today.get((model, status), 0) + value
+            moved_by_day[(day, status)] = moved_by_day.get((day, status), 0) + value
+
+        # Порядок — как в справочниках; значения вне справочников добавляются в конец
+        models = list(MODELS) + sorted({key[0] for key in counts} - set(MODELS))
+        used_statuses = {key[1] for key in counts} | {key[1] for key in moved_by_day}
+        statuses = list(STATUSES) + sorted(used_statuses - set(STATUSES))
+        total = "Всего"
+
+        self.table.clear()
+        self.table.setRowCount(len(models) + 1)
+        self.table.setColumnCount(len(statuses) + 1)
+        self.table.setVerticalHeaderLabels(models + [total])
+        self.table.setHorizontalHeaderLabels(statuses + [total])
+
+        for row, model in enumerate(models + [None]):
+            for col, status in enumerate(statuses + [None]):
+                keys = [(m, s) for m in (models if model is None else [model])
+                        for s in (statuses if status is None else [status])]
+                count = sum(counts.get(key, 0) for key in keys)
+                moved = sum(moved_today.get(key, 0) for key in keys)
+                color = STATUS_COLORS.get(status, "#ffffff") if status is not None and count else None
+                self.table.setItem(row, col, _item(f"{count} (+{moved})" if moved else str(count), color))
+        _fit_height(self.table)
+
+        # Переходы по дням, по всем моделям: последний день сверху
+        days = [today - timedelta(days=offset) for offset in range(DASHBOARD_DAYS)]
+        self.daily_table.clear()
+        self.daily_table.setRowCount(len(days))
+        self.daily_table.setColumnCount(len(statuses))
+        self.daily_table.setVerticalHeaderLabels([day.strftime("%d.%m") for day in days])
+        self.daily_table.setHorizontalHeaderLabels(statuses)
+        for row, day in enumerate(days):
+            for col, status in enumerate(statuses):
+                moved = moved_by_day.get((day, status), 0)
+                color = STATUS_COLORS.get(status, "#ffffff") if moved else None
+                self.daily_table.setItem(row, col, _item(str(moved) if moved else "", color))
+        _fit_height(self.daily_table)
+
+    # Перерисовка после смены справочников
+    def refresh_layout(self):
+        self.set_summary(self._summary)
@@ -1,18 +1,187 @@
+import csv
+import io
+import threading
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+from psycopg2.extensions import STATUS_READY, cursor as BaseCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from constants import EDITABLE_FIELDS, SEARCH_EXPRESSION, DEFAULT_MODELS, DEFAULT_STATUSES
+from instrument import instrumented, note_sql
 
 DB_CONFIG = {
     "dbname": "robots_db",
     "user": "postgres",
     "password": "admin",
     "host": "192.168.0.236",
-    "port": 5432
+    "port": 5432,
+    "connect_timeout": 5,
+    # TCP keepalive, чтобы оборванное сетевое соединение обнаруживалось быстро
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3
 }
 
-def init_db():
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute("""
+# psycopg2 держит открытыми только minconn свободных соединений, остальные закрывает
+# при возврате в пул. Минимум равен максимуму (и числу потоков DbExecutor), чтобы
+# параллельные операции не открывали каждый раз новое TCP-соединение
+POOL_MAX_CONNECTIONS = 4
+POOL_MIN_CONNECTIONS = POOL_MAX_CONNECTIONS
+
+# Канал LISTEN/NOTIFY, в который пишет триггер при любом изменении robots
+NOTIFY_CHANNEL = "robots_changed"
+
+# Классы ошибок, среди которых бывают обрывы связи. Но в psycopg2 от OperationalError
+# наследуются и обычные ошибки сервера (взаимоблокировка, таймаут блокировки),
+# поэтому проверять нужно через is_connection_error
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Коды SQLSTATE, с которыми сервер сам закрывает соединение
+_DISCONNECT_PGCODES = ("57P01", "57P02", "57P03")
+
+# Сколько раз повторять транзакцию, которую сервер откатил из-за взаимоблокировки
+# или конфликта сериализации
+ROLLBACK_RETRIES = 3
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# 📶 Счётчик обращений к серверу (BEGIN, запросы, FETCH серверного курсора, COPY, COMMIT)
+_round_trips = 0
+_round_trips_lock = threading.Lock()
+
+def _count_round_trip():
+    global _round_trips
+    with _round_trips_lock:
+        _round_trips += 1
+
+def round_trip_count():
+    return _round_trips
+
+class _RoundTripCounter:
+    def _count_statement(self, query):
+        # Перед первым запросом транзакции psycopg2 отдельно отправляет BEGIN
+        if not self.connection.autocommit and self.connection.status == STATUS_READY:
+            _count_round_trip()
+        _count_round_trip()
+        note_sql(query)
+
+    def execute(self, query, vars=None):
+        self._count_statement(query)
+        return super().execute(query, vars)
+
+    def copy_expert(self, sql, file, size=8192):
+        self._count_statement(sql)
+        return super().copy_expert(sql, file, size)
+
+    def fetchmany(self, size=None):
+        # У серверного курсора каждая порция — отдельный FETCH
+        if self.name is not None:
+            _count_round_trip()
+        return super().fetchmany(size) if size is not None else super().fetchmany()
+
+class _CountingCursor(_RoundTripCounter, BaseCursor):
+    pass
+
+class _CountingDictCursor(_RoundTripCounter, RealDictCursor):
+    pass
+
+_COUNTING_CURSORS = {None: _CountingCursor, RealDictCursor: _CountingDictCursor}
+
+def is_connection_error(error):
+    """Обрыв связи с сервером. Ответ сервера с ошибкой всегда содержит pgcode."""
+    if not isinstance(error, CONNECTION_ERRORS):
+        return False
+    pgcode = error.pgcode
+    return pgcode is None or pgcode.startswith("08") or pgcode in _DISCONNECT_PGCODES
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = ThreadedConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, **DB_CONFIG)
+        return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+
+@contextmanager
+def transaction(cursor_factory=None, name=None):
+    """Одна транзакция на одном соединении из пула.
+
+    При выходе без ошибок выполняется COMMIT, при исключении — ROLLBACK.
+    Соединение, оборванное сетью, закрывается и не возвращается в пул;
+    после ошибки сервера (взаимоблокировка и т. п.) оно остаётся рабочим.
+    Если задан name, курсор серверный (DECLARE ... CURSOR) и читается порциями.
+    """
+    cursor_factory = _COUNTING_CURSORS.get(cursor_factory, cursor_factory)
+    pool = get_pool()
+    conn = pool.getconn()
+    while conn.closed:
+        # Соединение закрылось, пока лежало в пуле — берём новое
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+    broken = False
+    try:
+        with conn.cursor(name=name, cursor_factory=cursor_factory) as cursor:
+            yield cursor
+        if conn.status != STATUS_READY:
+            # Без единого запроса транзакция не начиналась и COMMIT не отправляется
+            _count_round_trip()
+        conn.commit()
+    except BaseException as error:
+        if conn.closed or is_connection_error(error):
+            broken = True
+        else:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        raise
+    finally:
+        pool.putconn(conn, close=broken or conn.closed != 0)
+
+def run_in_transaction(operation, cursor_factory=None, retries=1):
+    """Выполняет operation(cursor) в транзакции, повторяя её после обрыва связи.
+
+    Повтор после обрыва безопасен, только если операция идемпотентна — для
+    INSERT передавайте retries=0. Транзакцию, откаченную сервером из-за
+    взаимоблокировки или конфликта сериализации, повторяем всегда: она
+    гарантированно не применилась.
+    """
+    rollback_retries = ROLLBACK_RETRIES
+    while True:
+        try:
+            with transaction(cursor_factory) as cursor:
+                return operation(cursor)
+        except psycopg2.errors.TransactionRollbackError:
+            if rollback_retries <= 0:
+                raise
+            rollback_retries -= 1
+        except CONNECTION_ERRORS as error:
+            if retries <= 0 or not is_connection_error(error):
+                raise
+            retries -= 1
+
+def _sql_literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+# Ключ pg_try_advisory_xact_lock: дельты сводки сворачивает одна станция за раз
+STATUS_ROLLUP_LOCK_ID = 7310002
+
+# 🗂️ Миграции схемы: (версия, описание, SQL). Новые добавлять только в конец.
+# Миграции 1–3 повторяют прежний init_db и идемпотентны: базы, созданные до
+# появления schema_version, проходят их без изменений.
+MIGRATIONS = [
+    (1, "Таблица robots", """
         CREATE TABLE IF NOT EXISTS robots (
             id SERIAL PRIMARY KEY,
             model TEXT,
@@ -26,53 +195,580 @@ def init_db():
             tasks_required TEXT,
             required_parts TEXT
         )
-    """)
-    conn.commit()
-    cursor.close()
-    conn.close()
+    """),
+    (2, "Версии строк, мягкое удаление и NOTIFY для инкрементальной синхронизации", f"""
+        CREATE SEQUENCE IF NOT EXISTS robots_row_version_seq;
+        ALTER TABLE robots
+            ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            ADD COLUMN IF NOT EXISTS row_version BIGINT,
+            ADD COLUMN IF NOT EXISTS deleted BOOLEAN NOT NULL DEFAULT FALSE;
+        UPDATE robots SET row_version = nextval('robots_row_version_seq')
+            WHERE row_version IS NULL;
+        ALTER TABLE robots
+            ALTER COLUMN row_version SET DEFAULT nextval('robots_row_version_seq'),
+            ALTER COLUMN row_version SET NOT NULL;
+        CREATE INDEX IF NOT EXISTS robots_row_version_idx ON robots (row_version);
+
+        CREATE OR REPLACE FUNCTION robots_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.row_version := nextval('robots_row_version_seq');
+            NEW.updated_at := now();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION robots_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', '');
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS robots_touch ON robots;
+        CREATE TRIGGER robots_touch BEFORE INSERT OR UPDATE ON robots
+            FOR EACH ROW EXECUTE PROCEDURE robots_touch();
+
+        -- Одно уведомление на оператор: клиенты сами забирают изменённые строки
+        DROP TRIGGER IF EXISTS robots_notify ON robots;
+        CREATE TRIGGER robots_notify AFTER INSERT OR UPDATE OR DELETE ON robots
+            FOR EACH STATEMENT EXECUTE PROCEDURE robots_notify();
+    """),
+    (3, "Триграммный индекс для поиска подстроки по текстовым полям", f"""
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS robots_search_trgm_idx ON robots
+            USING gin ({SEARCH_EXPRESSION} gin_trgm_ops) WHERE NOT deleted;
+    """),
+    (4, "Справочники моделей и статусов, индексы по серийным номерам, статусу и модели", f"""
+        CREATE TABLE robot_models (
+            name TEXT PRIMARY KEY,
+            sort_order INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE robot_statuses (
+            name TEXT PRIMARY KEY,
+            sort_order INTEGER NOT NULL DEFAULT 0,
+            color TEXT NOT NULL DEFAULT '#ffffff'
+        );
+        INSERT INTO robot_models (name, sort_order) VALUES
+            {", ".join(f"({_sql_literal(name)}, {order})"
+                       for order, name in enumerate(DEFAULT_MODELS, start=1))};
+        INSERT INTO robot_statuses (name, sort_order, color) VALUES
+            {", ".join(f"({_sql_literal(name)}, {order}, {_sql_literal(color)})"
+                       for order, (name, color) in enumerate(DEFAULT_STATUSES, start=1))};
+
+        -- Уже введённые нестандартные значения переносим в справочники, чтобы не потерять данные
+        UPDATE robots SET model = '-' WHERE model IS NULL OR model = '';
+        UPDATE robots SET status = '-' WHERE status IS NULL OR status = '';
+        INSERT INTO robot_models (name, sort_order)
+            SELECT DISTINCT model, 100 FROM robots ON CONFLICT DO NOTHING;
+        INSERT INTO robot_statuses (name, sort_order)
+            SELECT DISTINCT status, 100 FROM robots ON CONFLICT DO NOTHING;
+
+        ALTER TABLE robots
+            ALTER COLUMN model SET DEFAULT '-',
+            ALTER COLUMN model SET NOT NULL,
+            ALTER COLUMN status SET DEFAULT '-',
+            ALTER COLUMN status SET NOT NULL,
+            ADD CONSTRAINT robots_model_fkey FOREIGN KEY (model)
+                REFERENCES robot_models (name) ON UPDATE CASCADE,
+            ADD CONSTRAINT robots_status_fkey FOREIGN KEY (status)
+                REFERENCES robot_statuses (name) ON UPDATE CASCADE;
+
+        CREATE INDEX robots_robot_sn_idx ON robots (robot_sn);
+        CREATE INDEX robots_controller_sn_idx ON robots (controller_sn);
+        CREATE INDEX robots_status_idx ON robots (status);
+        CREATE INDEX robots_model_idx ON robots (model);
+    """),
+    (5, "История статусов и сводные таблицы для панели показателей", """
+        CREATE TABLE robot_status_history (
+            id BIGSERIAL PRIMARY KEY,
+            robot_id INTEGER NOT NULL REFERENCES robots (id),
+            model TEXT NOT NULL,
+            old_status TEXT,
+            new_status TEXT NOT NULL,
+            changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX robot_status_history_robot_idx ON robot_status_history (robot_id, changed_at);
+
+        -- Сводки ведутся триггером, поэтому панель читает несколько десятков строк
+        -- независимо от размера парка
+        CREATE TABLE robot_status_counts (
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            robots INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (model, status)
+        );
+        CREATE TABLE robot_status_daily (
+            day DATE NOT NULL,
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            transitions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, model, status)
+        );
+        INSERT INTO robot_status_counts (model, status, robots)
+            SELECT model, status, count(*) FROM robots WHERE NOT deleted GROUP BY model, status;
+
+        CREATE FUNCTION robots_track_status() RETURNS trigger AS $$
+        DECLARE
+            previous_status TEXT := NULL;
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                IF OLD.model = NEW.model AND OLD.status = NEW.status AND OLD.deleted = NEW.deleted THEN
+                    RETURN NULL;
+                END IF;
+                IF NOT OLD.deleted THEN
+                    previous_status := OLD.status;
+                    UPDATE robot_status_counts SET robots = robots - 1
+                        WHERE model = OLD.model AND status = OLD.status;
+                END IF;
+            END IF;
+
+            IF NEW.deleted THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO robot_status_counts (model, status, robots)
+                VALUES (NEW.model, NEW.status, 1)
+                ON CONFLICT (model, status) DO UPDATE SET robots = robot_status_counts.robots + 1;
 
+            IF previous_status IS DISTINCT FROM NEW.status THEN
+                INSERT INTO robot_status_history (robot_id, model, old_status, new_status)
+                    VALUES (NEW.id, NEW.model, previous_status, NEW.status);
+                INSERT INTO robot_status_daily (day, model, status, transitions)
+                    VALUES (current_date, NEW.model, NEW.status, 1)
+                    ON CONFLICT (day, model, status)
+                    DO UPDATE SET transitions = robot_status_daily.transitions + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER robots_track_status AFTER INSERT OR UPDATE OF model, status, deleted ON robots
+            FOR EACH ROW EXECUTE PROCEDURE robots_track_status();
+    """),
+    (6, "Номер транзакции последнего изменения строки для синхронизации без пропусков", """
+        -- row_version выдаётся при выполнении оператора, а не при COMMIT: транзакция,
+        -- взявшая меньшую версию, может зафиксироваться позже большей. Поэтому клиенты
+        -- синхронизируются по номеру транзакции и границе xmin снимка (см. get_robots_since)
+        ALTER TABLE robots ADD COLUMN row_txid BIGINT NOT NULL DEFAULT 0;
+        CREATE INDEX robots_row_txid_idx ON robots (row_txid);
+
+        CREATE OR REPLACE FUNCTION robots_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.row_version := nextval('robots_row_version_seq');
+            NEW.row_txid := txid_current();
+            NEW.updated_at := now();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """),
+    (7, "Дельты сводки статусов вместо обновления общих счётчиков в триггере", f"""
+        -- Триггер только добавляет строки-дельты и не блокирует общие строки счётчиков:
+        -- встречные переводы статусов не взаимоблокируются, а импорт не задерживает
+        -- сохранения других станций. В счётчики дельты сворачивает robot_status_rollup()
+        CREATE TABLE robot_status_deltas (
+            id BIGSERIAL PRIMARY KEY,
+            day DATE NOT NULL DEFAULT current_date,
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            robots INTEGER NOT NULL,
+            transitions INTEGER NOT NULL
+        );
+
+        CREATE OR REPLACE FUNCTION robots_track_status() RETURNS trigger AS $$
+        DECLARE
+            previous_status TEXT := NULL;
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                IF OLD.model = NEW.model AND OLD.status = NEW.status AND OLD.deleted = NEW.deleted THEN
+                    RETURN NULL;
+                END IF;
+                IF NOT OLD.deleted THEN
+                    previous_status := OLD.status;
+                    INSERT INTO robot_status_deltas (model, status, robots, transitions)
+                        VALUES (OLD.model, OLD.status, -1, 0);
+                END IF;
+            END IF;
+
+            IF NEW.deleted THEN
+                RETURN NULL;
+            END IF;
+            IF previous_status IS DISTINCT FROM NEW.status THEN
+                INSERT INTO robot_status_history (robot_id, model, old_status, new_status)
+                    VALUES (NEW.id, NEW.model, previous_status, NEW.status);
+                INSERT INTO robot_status_deltas (model, status, robots, transitions)
+                    VALUES (NEW.model, NEW.status, 1, 1);
+            ELSE
+                INSERT INTO robot_status_deltas (model, status, robots, transitions)
+                    VALUES (NEW.model, NEW.status, 1, 0);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+
+        -- Сворачивает одна станция за раз, остальные пропускают. Видимые дельты удаляются
+        -- и прибавляются к сводкам одним оператором; незафиксированные останутся до следующей
+        CREATE FUNCTION robot_status_rollup() RETURNS void AS $$
+        BEGIN
+            IF NOT pg_try_advisory_xact_lock({STATUS_ROLLUP_LOCK_ID}) THEN
+                RETURN;
+            END IF;
+            WITH moved AS (
+                DELETE FROM robot_status_deltas RETURNING day, model, status, robots, transitions
+            ), counts AS (
+                INSERT INTO robot_status_counts (model, status, robots)
+                    SELECT model, status, sum(robots) FROM moved GROUP BY model, status
+                    ON CONFLICT (model, status)
+                    DO UPDATE SET robots = robot_status_counts.robots + excluded.robots
+            )
+            INSERT INTO robot_status_daily (day, model, status, transitions)
+                SELECT day, model, status, sum(transitions) FROM moved
+                WHERE transitions <> 0 GROUP BY day, model, status
+                ON CONFLICT (day, model, status)
+                DO UPDATE SET transitions = robot_status_daily.transitions + excluded.transitions;
+        END
+        $$ LANGUAGE plpgsql;
+    """),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Ключ pg_advisory_xact_lock: миграции выполняет только одна станция одновременно
+MIGRATION_LOCK_ID = 7310001
+
+def get_schema_version():
+    def fetch(cursor):
+        cursor.execute("SELECT max(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+    try:
+        return run_in_transaction(fetch)
+    except psycopg2.errors.UndefinedTable:
+        return 0
+
+@instrumented("db.init_db")
+def init_db():
+    """Приводит схему к SCHEMA_VERSION.
+
+    Если схема актуальна, выполняется один SELECT и никакого DDL.
+    """
+    if get_schema_version() >= SCHEMA_VERSION:
+        return
+
+    def migrate(cursor):
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        # Пока ждали блокировку, другая станция могла уже выполнить миграции
+        cursor.execute("SELECT coalesce(max(version), 0) FROM schema_version")
+        current = cursor.fetchone()[0]
+        for version, description, sql in MIGRATIONS:
+            if version <= current:
+                continue
+            cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                           (version, description))
+    run_in_transaction(migrate, retries=0)
+
+def reset_for_bench():
+    """Очищает robots вместе с историей статусов и сводками (только для bench.py).
+
+    TRUNCATE не запускает строковые триггеры, поэтому сводные таблицы
+    очищаются в том же операторе, а не пересчитываются.
+    """
+    def reset(cursor):
+        cursor.execute("""
+            TRUNCATE robots, robot_status_history, robot_status_counts, robot_status_daily,
+                robot_status_deltas
+            RESTART IDENTITY
+        """)
+    run_in_transaction(reset)
+
+@instrumented("db.get_lookups")
+def get_lookups():
+    """Справочники для выпадающих списков: модели и статусы (с цветом) в порядке sort_order."""
+    def fetch(cursor):
+        cursor.execute("""
+            SELECT 'model' AS kind, name, NULL AS color, sort_order FROM robot_models
+            UNION ALL
+            SELECT 'status', name, color, sort_order FROM robot_statuses
+            ORDER BY kind, sort_order, name
+        """)
+        lookups = {"models": [], "statuses": []}
+        for kind, name, color, _ in cursor.fetchall():
+            if kind == "model":
+                lookups["models"].append(name)
+            else:
+                lookups["statuses"].append([name, color])
+        return lookups
+    return run_in_transaction(fetch)
+
+@instrumented("db.get_dashboard")
+def get_dashboard(days=7):
+    """Сводка для панели: свёртка накопленных дельт и один запрос к сводным таблицам.
+
+    Возвращает {"counts": [(модель, статус, роботов)],
+    "daily": [(день, модель, статус, переходов)]} — переходы за последние days дней.
+    """
+    def fetch(cursor):
+        cursor.execute("SELECT robot_status_rollup()")
+        # Дельты, которые не удалось свернуть (сворачивает другая станция), учитываем при чтении
+        cursor.execute("""
+            SELECT 'counts', NULL::date, model, status, sum(robots)::int FROM (
+                SELECT model, status, robots FROM robot_status_counts
+                UNION ALL
+                SELECT model, status, robots FROM robot_status_deltas
+            ) AS c
+            GROUP BY model, status HAVING sum(robots) > 0
+            UNION ALL
+            SELECT 'daily', day, model, status, sum(transitions)::int FROM (
+                SELECT day, model, status, transitions FROM robot_status_daily
+                WHERE day > current_date - %(days)s
+                UNION ALL
+                SELECT day, model, status, transitions FROM robot_status_deltas
+                WHERE day > current_date - %(days)s AND transitions <> 0
+            ) AS d
+            GROUP BY day, model, status
+        """, {"days": days})
+        summary = {"counts": [], "daily": []}
+        for kind, day, model, status, value in cursor.fetchall():
+            if kind == "counts":
+                summary["counts"].append((model, status, value))
+            else:
+                summary["daily"].append((day, model, status, value))
+        return summary
+    return run_in_transaction(fetch)
+
+@instrumented("db.get_all_robots")
 def get_all_robots():
-    conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM robots ORDER BY id")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    def fetch(cursor):
+        cursor.execute("SELECT * FROM robots WHERE NOT deleted ORDER BY id")
+        return cursor.fetchall()
+    return run_in_transaction(fetch, cursor_factory=RealDictCursor)
+
+@instrumented("db.get_robots_since")
+def get_robots_since(watermark=None):
+    """Изменения для синхронизации клиента: (строки, новая отметка).
+
+    watermark=None — все неудалённые строки; иначе строки из транзакций с
+    номером не меньше отметки, включая удалённые (deleted = TRUE). Отметка —
+    xmin снимка, взятого до выборки: все транзакции с меньшим номером к этому
+    моменту завершены и попали в выборку, а ещё не зафиксированные войдут
+    в следующую. Часть строк поэтому может прийти повторно.
+    """
+    def fetch(cursor):
+        cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot()) AS xmin")
+        new_watermark = cursor.fetchone()["xmin"]
+        if watermark is None:
+            cursor.execute("SELECT * FROM robots WHERE NOT deleted ORDER BY id")
+        else:
+            cursor.execute("SELECT * FROM robots WHERE row_txid >= %s ORDER BY row_version",
+                           (watermark,))
+        return cursor.fetchall(), new_watermark
+    return run_in_transaction(fetch, cursor_factory=RealDictCursor)
 
+@instrumented("db.iter_robots")
+def iter_robots(ids=None, chunk_size=2000):
+    """Порции неудалённых роботов через серверный курсор.
+
+    В памяти одновременно не больше chunk_size строк. ids ограничивает
+    выборку заданными роботами.
+    """
+    query = "SELECT * FROM robots WHERE NOT deleted"
+    params = []
+    if ids is not None:
+        query += " AND id = ANY(%s)"
+        params.append(list(ids))
+    query += " ORDER BY id"
+    with transaction(RealDictCursor, name="robots_stream") as cursor:
+        cursor.itersize = chunk_size
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+@instrumented("db.search_robots")
+def search_robots(text="", model=None, status=None):
+    """id неудалённых роботов, подходящих под строку поиска и фильтры модели/статуса."""
+    conditions = ["NOT deleted"]
+    params = []
+    if text:
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append(f"{SEARCH_EXPRESSION} ILIKE %s")
+        params.append(f"%{escaped}%")
+    if model is not None:
+        conditions.append("model = %s")
+        params.append(model)
+    if status is not None:
+        conditions.append("status = %s")
+        params.append(status)
+
+    def fetch(cursor):
+        cursor.execute(f"SELECT id FROM robots WHERE {' AND '.join(conditions)}", params)
+        return [row[0] for row in cursor.fetchall()]
+    return run_in_transaction(fetch)
+
+@instrumented("db.update_robot")
 def update_robot(robot_id, field_name, new_value):
-    allowed_fields = {
-        "model", "robot_sn", "controller_sn", "status",
-        "fault_description", "fault_module", "fault_reason",
-        "tasks_done", "tasks_required", "required_parts"
-    }
-    if field_name not in allowed_fields:
+    if field_name not in EDITABLE_FIELDS:
         raise ValueError(f"Недопустимое поле: {field_name}")
 
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute(f"UPDATE robots SET {field_name} = %s WHERE id = %s", (new_value, robot_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    def update(cursor):
+        cursor.execute(f"UPDATE robots SET {field_name} = %s WHERE id = %s", (new_value, robot_id))
+    run_in_transaction(update)
 
+@instrumented("db.update_robots")
+def update_robots(changes):
+    """Сохраняет изменённые ячейки одним UPDATE ... FROM (VALUES ...).
+
+    changes — словарь {id робота: {поле: новое значение}}. Для каждой строки
+    передаётся список изменённых полей, остальные колонки остаются как есть.
+    """
+    if not changes:
+        return
+    used_fields = [field for field in EDITABLE_FIELDS
+                   if any(field in fields for fields in changes.values())]
+    for fields in changes.values():
+        for field_name in fields:
+            if field_name not in EDITABLE_FIELDS:
+                raise ValueError(f"Недопустимое поле: {field_name}")
+
+    rows = [
+        (robot_id, list(fields), *[fields.get(field) for field in used_fields])
+        for robot_id, fields in changes.items()
+    ]
+    assignments = ", ".join(
+        f"{field} = CASE WHEN '{field}' = ANY(v.changed) THEN v.{field} ELSE r.{field} END"
+        for field in used_fields
+    )
+    query = f"""
+        UPDATE robots AS r SET {assignments}
+        FROM (VALUES %s) AS v(id, changed, {", ".join(used_fields)})
+        WHERE r.id = v.id
+    """
+    template = "(%s, %s::text[], " + ", ".join(["%s::text"] * len(used_fields)) + ")"
+
+    def update(cursor):
+        # page_size = числу строк: весь пакет уходит одним запросом
+        execute_values(cursor, query, rows, template=template, page_size=len(rows))
+    run_in_transaction(update)
+
+@instrumented("db.add_robot")
 def add_robot():
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO robots (
-            model, robot_sn, controller_sn, status,
-            fault_description, fault_module, fault_reason,
-            tasks_done, tasks_required, required_parts
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """, ("-", "", "", "-", "", "", "", "", "", ""))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    def insert(cursor):
+        cursor.execute("""
+            INSERT INTO robots (
+                model, robot_sn, controller_sn, status,
+                fault_description, fault_module, fault_reason,
+                tasks_done, tasks_required, required_parts
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, ("-", "", "", "-", "", "", "", "", "", ""))
+        return cursor.fetchone()[0]
+    # INSERT не повторяем: при обрыве во время COMMIT строка могла уже добавиться
+    return run_in_transaction(insert, retries=0)
 
+@instrumented("db.delete_robot")
 def delete_robot(robot_id):
+    # Мягкое удаление: строка остаётся «надгробием», чтобы другие клиенты узнали об удалении
+    def delete(cursor):
+        cursor.execute("UPDATE robots SET deleted = TRUE WHERE id = %s", (robot_id,))
+    run_in_transaction(delete)
+
+class _CopyStream:
+    """Файлоподобный объект для COPY FROM STDIN: строки сериализуются в CSV по мере чтения."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL)
+        self._pending = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+@instrumented("db.bulk_upsert_robots")
+def bulk_upsert_robots(rows, fields):
+    """Загружает строки через COPY во временную таблицу и сливает их с robots по robot_sn.
+
+    rows — итерируемое кортежей (номер строки файла, значения полей fields...).
+    Обновляются только колонки из fields, пустые значения существующих данных
+    не затирают; у новых роботов пустые модель и статус становятся «-». Если в
+    файле несколько строк с одним robot_sn, побеждает последняя.
+    Возвращает (добавлено, обновлено).
+    """
+    if "robot_sn" not in fields:
+        raise ValueError("Для импорта нужна колонка robot_sn")
+    for field_name in fields:
+        if field_name not in EDITABLE_FIELDS:
+            raise ValueError(f"Недопустимое поле: {field_name}")
+    columns = ", ".join(fields)
+    update_fields = [field for field in fields if field != "robot_sn"]
+
+    with transaction() as cursor:
+        cursor.execute(f"""
+            CREATE TEMP TABLE robots_import (
+                line_no INTEGER,
+                {", ".join(f"{field} TEXT" for field in fields)}
+            ) ON COMMIT DROP
+        """)
+        cursor.copy_expert(f"COPY robots_import (line_no, {columns}) FROM STDIN WITH (FORMAT csv)",
+                           _CopyStream(rows))
+        cursor.execute(f"""
+            CREATE TEMP TABLE robots_import_latest ON COMMIT DROP AS
+            SELECT DISTINCT ON (robot_sn) {columns}
+            FROM robots_import ORDER BY robot_sn, line_no DESC
+        """)
+        updated = 0
+        if update_fields:
+            assignments = ", ".join(f"{field} = coalesce(nullif(i.{field}, ''), r.{field})"
+                                    for field in update_fields)
+            cursor.execute(f"""
+                UPDATE robots AS r SET {assignments}
+                FROM robots_import_latest AS i
+                WHERE r.robot_sn = i.robot_sn AND NOT r.deleted
+            """)
+            updated = cursor.rowcount
+        # Колонки, которых нет в файле, и пустые ячейки у новых роботов заполняются как в add_robot
+        defaults = {field: "" for field in EDITABLE_FIELDS}
+        defaults.update(model="-", status="-")
+        select_list = ", ".join(
+            f"coalesce(nullif(i.{field}, ''), {cursor.mogrify('%s', (defaults[field],)).decode()})"
+            if field in fields else cursor.mogrify("%s", (defaults[field],)).decode()
+            for field in EDITABLE_FIELDS
+        )
+        cursor.execute(f"""
+            INSERT INTO robots ({", ".join(EDITABLE_FIELDS)})
+            SELECT {select_list} FROM robots_import_latest AS i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM robots AS r WHERE r.robot_sn = i.robot_sn AND NOT r.deleted
+            )
+        """)
+        inserted = cursor.rowcount
+    return inserted, updated
+
+@instrumented("db.open_listener")
+def open_listener():
+    """Отдельное соединение вне пула, подписанное на NOTIFY_CHANNEL.
+
+    Соединение в режиме autocommit; уведомления читаются через conn.poll().
+    """
     conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM robots WHERE id = %s", (robot_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    return conn
@@ -0,0 +1,58 @@
+import csv
+import os
+
+from openpyxl import Workbook
+
+from db import iter_robots
+from table_model import HEADERS, DB_FIELDS
+from workers import TaskCancelled
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _iter_export_rows(ids, total, task):
+    done = 0
+    for chunk in iter_robots(ids, EXPORT_CHUNK_SIZE):
+        if task is not None and task.is_cancelled():
+            raise TaskCancelled()
+        for robot in chunk:
+            yield [robot.get(field, "") for field in DB_FIELDS]
+        done += len(chunk)
+        if task is not None:
+            task.report_progress(done, max(total, done))
+
+
+def _write_xlsx(path, rows):
+    # write_only: строки сразу уходят во временный файл, а не копятся в памяти
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Роботы ОТК")
+    ws.append(HEADERS)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def _write_csv(path, rows):
+    # utf-8-sig и «;» — чтобы русский Excel открывал файл без мастера импорта
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+
+
+# 📄 Потоковая выгрузка роботов в .xlsx или .csv (формат по расширению файла)
+def export_robots(path, ids=None, total=0, task=None):
+    """Выгружает роботов (все или только ids) в path, не держа таблицу в памяти.
+
+    Пишет во временный файл рядом с path и переименовывает его после успешной
+    записи, поэтому при ошибке или отмене старый файл не портится.
+    """
+    writer = _write_csv if path.lower().endswith(".csv") else _write_xlsx
+    tmp_path = path + ".part"
+    try:
+        writer(tmp_path, _iter_export_rows(ids, total, task))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
@@ -0,0 +1,116 @@
+import csv
+
+from openpyxl import load_workbook
+
+from db import bulk_upsert_robots, get_lookups
+from table_model import HEADERS, DB_FIELDS, to_cell_text
+from workers import TaskCancelled
+
+# Сколько ошибок проверки сохранять для показа пользователю (считаются все)
+MAX_REPORTED_ERRORS = 1000
+PROGRESS_EVERY_ROWS = 1000
+
+# Заголовок колонки в файле -> поле БД: принимаются и русские заголовки, и имена полей
+COLUMN_NAMES = {header.lower(): field for header, field in zip(HEADERS, DB_FIELDS)}
+COLUMN_NAMES.update({field: field for field in DB_FIELDS})
+
+
+def _read_xlsx(path):
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        first_line = file.readline()
+        file.seek(0)
+        # Экспорт из русского Excel разделён «;», остальные CSV — запятыми
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+        yield from csv.reader(file, delimiter=delimiter)
+
+
+def _cell_text(value):
+    # Серийные номера из Excel часто приходят числами: 12345.0 -> "12345"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return to_cell_text(value).strip()
+
+
+def _map_header(header):
+    columns = {}
+    for index, name in enumerate(header):
+        field = COLUMN_NAMES.get(_cell_text(name).lower())
+        if field is not None and field not in columns.values():
+            columns[index] = field
+    return columns
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.rows_read = 0
+        self.error_count = 0
+        self.errors = []    # (номер строки, сообщение), не больше MAX_REPORTED_ERRORS
+
+    def add_error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, message))
+
+
+def _validate(line_no, values, models, statuses, report):
+    robot = {field: _cell_text(value) for field, value in values.items()}
+    if not robot.get("robot_sn"):
+        report.add_error(line_no, "не указан серийный № робота")
+        return None
+    # Пустая ячейка — «не указано»: проверять по справочнику нечего (см. bulk_upsert_robots)
+    if robot.get("model") and robot["model"] not in models:
+        report.add_error(line_no, f"неизвестная модель «{robot['model']}»")
+        return None
+    if robot.get("status") and robot["status"] not in statuses:
+        report.add_error(line_no, f"неизвестный статус «{robot['status']}»")
+        return None
+    return robot
+
+
+def _valid_rows(rows, columns, fields, lookups, report, task):
+    models = set(lookups["models"])
+    statuses = {name for name, _ in lookups["statuses"]}
+    for line_no, row in enumerate(rows, start=2):
+        if task is not None and task.is_cancelled():
+            raise TaskCancelled()
+        report.rows_read += 1
+        if task is not None and report.rows_read % PROGRESS_EVERY_ROWS == 0:
+            task.report_progress(report.rows_read, 0)
+        # Строка короче заголовка (CSV с «рваными» строками): недостающие ячейки считаем пустыми
+        values = {field: row[index] if index < len(row) else None for index, field in columns.items()}
+        if not any(_cell_text(value) for value in values.values()):
+            continue    # пустые строки в конце таблиц — не ошибка
+        robot = _validate(line_no, values, models, statuses, report)
+        if robot is not None:
+            yield (line_no, *[robot[field] for field in fields])
+
+
+# 📥 Импорт роботов из .xlsx или .csv: COPY во временную таблицу и слияние по robot_sn.
+# Пустые ячейки не затирают значения существующих роботов: импорт только дополняет
+# и исправляет данные, очистить поле можно в таблице
+def import_robots(path, task=None):
+    rows = _read_csv(path) if path.lower().endswith(".csv") else _read_xlsx(path)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Файл пуст")
+    columns = _map_header(header)
+    if "robot_sn" not in columns.values():
+        raise ValueError("В файле нет колонки «Серийный № робота»")
+    fields = [field for field in DB_FIELDS if field in columns.values()]
+
+    # Проверяем по справочникам сервера: иначе строку отвергнет внешний ключ
+    lookups = get_lookups()
+    report = ImportReport()
+    report.inserted, report.updated = bulk_upsert_robots(
+        _valid_rows(rows, columns, fields, lookups, report, task), fields)
+    return report
@@ -0,0 +1,194 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 📊 Сбор статистики по операциям с БД и интерфейсу.
+# Выключен по умолчанию; включается ROBOTS_INSTRUMENT=1 или из окна статистики.
+ENABLED = os.environ.get("ROBOTS_INSTRUMENT") == "1"
+SLOW_THRESHOLD_MS = float(os.environ.get("ROBOTS_SLOW_MS", "500"))
+MAX_SLOW_RECORDS = 200
+MAX_SQL_LENGTH = 1000
+
+logger = logging.getLogger("robots.instrument")
+
+_lock = threading.Lock()
+_stats = {}                                   # операция -> счётчики
+_slow = deque(maxlen=MAX_SLOW_RECORDS)        # последние медленные операции
+_local = threading.local()                    # SQL, выполненный текущей операцией потока
+
+
+def is_enabled():
+    return ENABLED
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = enabled
+
+
+def set_slow_threshold(ms):
+    global SLOW_THRESHOLD_MS
+    SLOW_THRESHOLD_MS = ms
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _slow.clear()
+
+
+def note_sql(query):
+    """Вызывается курсором db.py на каждый запрос; без активной операции ничего не делает."""
+    collected = getattr(_local, "sql", None)
+    if collected is not None:
+        if isinstance(query, bytes):
+            query = query.decode("utf-8", "replace")
+        collected.append(" ".join(str(query).split())[:MAX_SQL_LENGTH])
+
+
+def record(name, seconds, rows=0, sql=()):
+    ms = seconds * 1000
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+        stats["count"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["rows"] += rows
+        if ms >= SLOW_THRESHOLD_MS:
+            _slow.append({
+                "operation": name,
+                "ms": round(ms, 1),
+                "rows": rows,
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "sql": list(sql),
+            })
+    if ms >= SLOW_THRESHOLD_MS:
+        logger.warning("Медленная операция %s: %.0f мс, строк %d%s", name, ms, rows,
+                       "".join(f"\n    SQL: {query}" for query in sql))
+
+
+def _count_rows(result):
+    if isinstance(result, list):
+        return len(result)
+    # (строки, отметка синхронизации) из get_robots_since
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    return 0
+
+
+@contextmanager
+def _collect_sql():
+    outer = getattr(_local, "sql", None)
+    collected = []
+    _local.sql = collected
+    try:
+        yield collected
+    finally:
+        _local.sql = outer
+        if outer is not None:
+            outer.extend(collected)
+
+
+def instrumented(name):
+    """Декоратор для функций db.py. Когда сбор выключен — только проверка флага."""
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    yield from fn(*args, **kwargs)
+                    return
+                # Учитываются только шаги самого генератора (запросы и FETCH), а не
+                # работа потребителя между порциями — запись файла и т. п.
+                chunks = fn(*args, **kwargs)
+                elapsed = 0.0
+                rows = 0
+                sql = []
+
+                def timed(step):
+                    nonlocal elapsed
+                    started = time.perf_counter()
+                    with _collect_sql() as collected:
+                        try:
+                            return step()
+                        finally:
+                            elapsed += time.perf_counter() - started
+                            sql.extend(collected)
+
+                try:
+                    while True:
+                        try:
+                            chunk = timed(lambda: next(chunks))
+                        except StopIteration:
+                            break
+                        rows += _count_rows(chunk)
+                        yield chunk
+                finally:
+                    # При досрочном закрытии (отмена экспорта) курсор закрывается здесь
+                    timed(chunks.close)
+                    record(name, elapsed, rows, sql)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            rows = 0
+            with _collect_sql() as sql:
+                try:
+                    result = fn(*args, **kwargs)
+                    rows = _count_rows(result)
+                    return result
+                finally:
+                    record(name, time.perf_counter() - started, rows, sql)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def measure(name, rows=0):
+    """Замер синхронного участка кода (например, применения данных к модели)."""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started, rows)
+
+
+def start(name):
+    """Начало асинхронной операции интерфейса: от запроса до применения результата."""
+    return (name, time.perf_counter()) if ENABLED else None
+
+
+def finish(token, rows=0):
+    if token is not None:
+        name, started = token
+        record(name, time.perf_counter() - started, rows)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "enabled": ENABLED,
+            "slow_threshold_ms": SLOW_THRESHOLD_MS,
+            "operations": {name: dict(stats) for name, stats in sorted(_stats.items())},
+            "slow": list(_slow),
+        }
+
+
+def dump(path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot(), file, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,58 @@
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+from db import open_listener, CONNECTION_ERRORS
+
+# 📡 Подписка на NOTIFY от PostgreSQL без блокировки интерфейса
+class ChangeListener(QObject):
+    changed = pyqtSignal()
+
+    RECONNECT_INTERVAL_MS = 10000
+
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self._executor = executor
+        self._conn = None
+        self._notifier = None
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.setInterval(self.RECONNECT_INTERVAL_MS)
+        self._reconnect_timer.timeout.connect(self.start)
+
+    def start(self):
+        self.stop()
+        # Подключение может занять до connect_timeout — выполняем его в фоне
+        self._executor.submit("Подписка на изменения", open_listener,
+                              on_result=self._attach, on_error=self._on_connect_failed,
+                              key="listener", silent=True)
+
+    def stop(self):
+        self._reconnect_timer.stop()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _attach(self, conn):
+        self._conn = conn
+        self._notifier = QSocketNotifier(conn.fileno(), QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._on_activity)
+        # Пока подписки не было, уведомления могли потеряться — просим досинхронизироваться
+        self.changed.emit()
+
+    def _on_connect_failed(self, error):
+        self._reconnect_timer.start()
+
+    def _on_activity(self):
+        try:
+            self._conn.poll()
+        except CONNECTION_ERRORS:
+            # Любая ошибка на слушающем соединении — переподключаемся
+            self.stop()
+            self._reconnect_timer.start()
+            return
+        if self._conn.notifies:
+            # Содержимое не важно: изменённые строки забираются по отметке синхронизации
+            del self._conn.notifies[:]
+            self.changed.emit()
@@ -1,14 +1,19 @@
+import logging
+import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
-from db import init_db
+from db import close_pool
 from ui import RobotTable
 
 def main():
-    init_db()  # Инициализация базы данных
+    # Медленные операции (см. instrument.py) пишутся в журнал: в файл ROBOTS_LOG_FILE или в консоль
+    logging.basicConfig(level=logging.INFO, filename=os.environ.get("ROBOTS_LOG_FILE"),
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
     app = QApplication(sys.argv)
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    app.aboutToQuit.connect(close_pool)
     window = RobotTable()
     window.showMaximized()
     sys.exit(app.exec_())
@@ -0,0 +1,271 @@
+"""Замена db.py на SQLite для бенчмарков и проверки без сервера PostgreSQL.
+
+Повторяет публичные функции db.py, которыми пользуется интерфейс. Чтобы
+подключить, модуль подставляется вместо db до импорта ui:
+sys.modules["db"] = sqlite_db (так делает bench.py). Поиск идёт без индекса,
+LISTEN/NOTIFY не поддерживается.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+
+from constants import EDITABLE_FIELDS, SEARCH_EXPRESSION, DEFAULT_MODELS, DEFAULT_STATUSES
+
+SQLITE_PATH = os.environ.get("ROBOTS_SQLITE_PATH",
+                             os.path.join(tempfile.gettempdir(), "robots_db.sqlite3"))
+
+POOL_MAX_CONNECTIONS = 4
+CONNECTION_ERRORS = (sqlite3.OperationalError,)
+
+_round_trips = 0
+_round_trips_lock = threading.Lock()
+
+
+def _count_round_trip(count=1):
+    global _round_trips
+    with _round_trips_lock:
+        _round_trips += count
+
+
+def round_trip_count():
+    return _round_trips
+
+
+def is_connection_error(error):
+    # Связь с файлом БД не обрывается: сюда попадает только невозможность открыть файл
+    return isinstance(error, CONNECTION_ERRORS) and "locked" not in str(error)
+
+
+def _connect():
+    conn = sqlite3.connect(SQLITE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _execute(conn, query, params=()):
+    _count_round_trip()
+    return conn.execute(query, params)
+
+
+def _to_dict(row):
+    robot = dict(row)
+    robot["deleted"] = bool(robot["deleted"])
+    return robot
+
+
+def _next_version(conn):
+    # Версию берёт и фиксирует только один писатель одновременно, иначе две транзакции
+    # получат одинаковый номер и читатель может пропустить одну из них
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    return _execute(conn, "SELECT coalesce(max(row_version), 0) + 1 FROM robots").fetchone()[0]
+
+
+def close_pool():
+    pass
+
+
+def init_db():
+    conn = _connect()
+    try:
+        with conn:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS robots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    {", ".join(f"{field} TEXT" for field in EDITABLE_FIELDS)},
+                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    row_version INTEGER NOT NULL DEFAULT 0,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS robots_row_version_idx ON robots (row_version);
+                CREATE INDEX IF NOT EXISTS robots_robot_sn_idx ON robots (robot_sn);
+                CREATE INDEX IF NOT EXISTS robots_controller_sn_idx ON robots (controller_sn);
+                CREATE INDEX IF NOT EXISTS robots_status_idx ON robots (status);
+                CREATE INDEX IF NOT EXISTS robots_model_idx ON robots (model);
+            """)
+    finally:
+        conn.close()
+
+
+def get_lookups():
+    return {"models": list(DEFAULT_MODELS), "statuses": [list(item) for item in DEFAULT_STATUSES]}
+
+
+def get_dashboard(days=7):
+    # В замене нет истории статусов — переходы по дням не считаются
+    conn = _connect()
+    try:
+        counts = [tuple(row) for row in _execute(
+            conn, "SELECT model, status, count(*) FROM robots WHERE NOT deleted GROUP BY model, status")]
+        return {"counts": counts, "daily": []}
+    finally:
+        conn.close()
+
+
+def get_all_robots():
+    conn = _connect()
+    try:
+        return [_to_dict(row) for row in
+                _execute(conn, "SELECT * FROM robots WHERE NOT deleted ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def get_robots_since(watermark=None):
+    # Запись в SQLite идёт по одной транзакции, поэтому отметкой служит row_version.
+    # Отметка читается до выборки: строки, записанные между запросами, придут ещё раз
+    conn = _connect()
+    try:
+        new_watermark = _execute(conn, "SELECT coalesce(max(row_version), 0) FROM robots").fetchone()[0]
+        if watermark is None:
+            rows = _execute(conn, "SELECT * FROM robots WHERE NOT deleted ORDER BY id")
+        else:
+            rows = _execute(conn, "SELECT * FROM robots WHERE row_version > ? ORDER BY row_version",
+                            (watermark,))
+        return [_to_dict(row) for row in rows], new_watermark
+    finally:
+        conn.close()
+
+
+def iter_robots(ids=None, chunk_size=2000):
+    query = "SELECT * FROM robots WHERE NOT deleted"
+    params = []
+    if ids is not None:
+        ids = list(ids)
+        query += f" AND id IN ({', '.join('?' for _ in ids)})"
+        params = ids
+    conn = _connect()
+    try:
+        cursor = _execute(conn, query + " ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [_to_dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def search_robots(text="", model=None, status=None):
+    # lower() в SQLite понимает только латиницу — для замены этого достаточно
+    conditions = ["NOT deleted"]
+    params = []
+    if text:
+        conditions.append(f"instr(lower({SEARCH_EXPRESSION}), ?) > 0")
+        params.append(text.lower())
+    if model is not None:
+        conditions.append("model = ?")
+        params.append(model)
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    conn = _connect()
+    try:
+        return [row[0] for row in
+                _execute(conn, f"SELECT id FROM robots WHERE {' AND '.join(conditions)}", params)]
+    finally:
+        conn.close()
+
+
+def update_robot(robot_id, field_name, new_value):
+    update_robots({robot_id: {field_name: new_value}})
+
+
+def update_robots(changes):
+    if not changes:
+        return
+    conn = _connect()
+    try:
+        with conn:
+            version = _next_version(conn)
+            for robot_id, fields in changes.items():
+                for field_name in fields:
+                    if field_name not in EDITABLE_FIELDS:
+                        raise ValueError(f"Недопустимое поле: {field_name}")
+                assignments = ", ".join(f"{field} = ?" for field in fields)
+                conn.execute(
+                    f"UPDATE robots SET {assignments}, row_version = ?, updated_at = CURRENT_TIMESTAMP"
+                    f" WHERE id = ?",
+                    (*fields.values(), version, robot_id))
+            # В PostgreSQL это один пакетный UPDATE
+            _count_round_trip()
+    finally:
+        conn.close()
+
+
+def add_robot():
+    conn = _connect()
+    try:
+        with conn:
+            cursor = _execute(conn, f"""
+                INSERT INTO robots ({", ".join(EDITABLE_FIELDS)}, row_version)
+                VALUES ({", ".join("?" for _ in EDITABLE_FIELDS)}, ?)
+            """, ("-", "", "", "-", "", "", "", "", "", "", _next_version(conn)))
+            return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def delete_robot(robot_id):
+    conn = _connect()
+    try:
+        with conn:
+            _execute(conn, "UPDATE robots SET deleted = 1, row_version = ? WHERE id = ?",
+                     (_next_version(conn), robot_id))
+    finally:
+        conn.close()
+
+
+def bulk_upsert_robots(rows, fields):
+    if "robot_sn" not in fields:
+        raise ValueError("Для импорта нужна колонка robot_sn")
+    for field_name in fields:
+        if field_name not in EDITABLE_FIELDS:
+            raise ValueError(f"Недопустимое поле: {field_name}")
+    columns = ", ".join(fields)
+    update_fields = [field for field in fields if field != "robot_sn"]
+    conn = _connect()
+    try:
+        with conn:
+            version = _next_version(conn)
+            conn.execute(f"CREATE TEMP TABLE robots_import (line_no INTEGER, {columns})")
+            conn.executemany(
+                f"INSERT INTO robots_import VALUES (?, {', '.join('?' for _ in fields)})", rows)
+            _count_round_trip()
+            conn.execute("CREATE INDEX temp.robots_import_sn_idx ON robots_import (robot_sn, line_no)")
+            conn.execute(f"""
+                CREATE TEMP TABLE robots_import_latest AS
+                SELECT {columns} FROM robots_import AS i
+                WHERE line_no = (SELECT max(line_no) FROM robots_import WHERE robot_sn = i.robot_sn)
+            """)
+            updated = 0
+            if update_fields:
+                assignments = ", ".join(f"{field} = coalesce(nullif(i.{field}, ''), robots.{field})"
+                                        for field in update_fields)
+                updated = _execute(conn, f"""
+                    UPDATE robots SET {assignments}, row_version = ?
+                    FROM robots_import_latest AS i
+                    WHERE robots.robot_sn = i.robot_sn AND NOT robots.deleted
+                """, (version,)).rowcount
+            defaults = {field: "''" for field in EDITABLE_FIELDS}
+            defaults.update(model="'-'", status="'-'")
+            select_list = ", ".join(f"coalesce(nullif(i.{field}, ''), {defaults[field]})"
+                                    if field in fields else defaults[field]
+                                    for field in EDITABLE_FIELDS)
+            inserted = _execute(conn, f"""
+                INSERT INTO robots ({", ".join(EDITABLE_FIELDS)}, row_version)
+                SELECT {select_list}, ? FROM robots_import_latest AS i
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM robots AS r WHERE r.robot_sn = i.robot_sn AND NOT r.deleted
+                )
+            """, (version,)).rowcount
+            conn.execute("DROP TABLE robots_import")
+            conn.execute("DROP TABLE robots_import_latest")
+        return inserted, updated
+    finally:
+        conn.close()
+
+
+def open_listener():
+    raise sqlite3.OperationalError("LISTEN/NOTIFY не поддерживается в SQLite")
@@ -0,0 +1,94 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QCheckBox, QSpinBox, QLabel, QFileDialog, QPlainTextEdit, QHeaderView
+)
+from PyQt5.QtCore import Qt
+
+import instrument
+
+
+# 📊 Окно статистики: счётчики операций, медленные запросы, выгрузка в файл
+class StatsDialog(QDialog):
+    COLUMNS = ["Операция", "Вызовов", "Всего, мс", "Среднее, мс", "Макс., мс", "Строк"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Статистика производительности")
+        self.resize(900, 500)
+
+        self.enabled_checkbox = QCheckBox("Сбор статистики включён")
+        self.enabled_checkbox.setChecked(instrument.is_enabled())
+        self.enabled_checkbox.toggled.connect(instrument.set_enabled)
+
+        self.threshold_input = QSpinBox()
+        self.threshold_input.setRange(1, 600000)
+        self.threshold_input.setSuffix(" мс")
+        self.threshold_input.setValue(int(instrument.SLOW_THRESHOLD_MS))
+        self.threshold_input.valueChanged.connect(instrument.set_slow_threshold)
+
+        settings_layout = QHBoxLayout()
+        settings_layout.addWidget(self.enabled_checkbox)
+        settings_layout.addStretch()
+        settings_layout.addWidget(QLabel("Порог медленной операции:"))
+        settings_layout.addWidget(self.threshold_input)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        self.slow_log = QPlainTextEdit()
+        self.slow_log.setReadOnly(True)
+
+        self.refresh_button = QPushButton("🔄 Обновить")
+        self.reset_button = QPushButton("🧹 Сбросить")
+        self.dump_button = QPushButton("💾 Сохранить в файл")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.reset_button.clicked.connect(self.reset)
+        self.dump_button.clicked.connect(self.dump)
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.dump_button)
+
+        layout = QVBoxLayout()
+        layout.addLayout(settings_layout)
+        layout.addWidget(self.table)
+        layout.addWidget(QLabel("Медленные операции:"))
+        layout.addWidget(self.slow_log)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self.refresh()
+
+    def refresh(self):
+        data = instrument.snapshot()
+        operations = data["operations"]
+        self.table.setRowCount(len(operations))
+        for row, (name, stats) in enumerate(operations.items()):
+            values = [
+                name, stats["count"], round(stats["total_ms"]),
+                round(stats["total_ms"] / stats["count"], 1), round(stats["max_ms"]), stats["rows"]
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if col:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+        lines = []
+        for record in reversed(data["slow"]):
+            lines.append(f"{record['at']}  {record['operation']}  {record['ms']} мс, строк {record['rows']}")
+            lines += [f"    {query}" for query in record["sql"]]
+        self.slow_log.setPlainText("\n".join(lines))
+
+    def reset(self):
+        instrument.reset()
+        self.refresh()
+
+    def dump(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить статистику", "robots_stats.json",
+                                              "JSON (*.json)")
+        if path:
+            instrument.dump(path)
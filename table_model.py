@@ -0,0 +1,277 @@
+from PyQt5.QtWidgets import QComboBox, QPlainTextEdit, QStyledItemDelegate
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
+from PyQt5.QtGui import QBrush, QColor, QTextOption
+
+from constants import EDITABLE_FIELDS, DEFAULT_MODELS, DEFAULT_STATUSES
+
+# 🏷️ Заголовки таблицы и поля БД
+HEADERS = [
+    "Модель", "Серийный № робота", "Серийный № контроллера",
+    "Текущий статус", "Описание неисправности",
+    "Проблемный узел/модуль", "Причина поломки", "Проведенные работы",
+    "Планируемые работы", "Необходимые запчасти"
+]
+DB_FIELDS = list(EDITABLE_FIELDS)
+
+# Значения по умолчанию; при подключении заменяются справочниками из БД (set_lookups)
+MODELS = list(DEFAULT_MODELS)
+STATUSES = [name for name, _ in DEFAULT_STATUSES]
+STATUS_COLORS = dict(DEFAULT_STATUSES)
+
+MODEL_COLUMN = DB_FIELDS.index("model")
+STATUS_COLUMN = DB_FIELDS.index("status")
+
+_status_brushes = {}    # кэш кистей для цветов статусов
+
+
+def set_lookups(lookups):
+    # Списки меняются на месте: делегаты и фильтры держат ссылки на них
+    MODELS[:] = lookups["models"]
+    STATUSES[:] = [name for name, _ in lookups["statuses"]]
+    STATUS_COLORS.clear()
+    STATUS_COLORS.update({name: color for name, color in lookups["statuses"]})
+    _status_brushes.clear()
+
+
+def to_cell_text(value):
+    return "" if value is None else str(value)
+
+
+# 🔧 Кастомный ComboBox, отключающий прокрутку мыши
+class NoScrollComboBox(QComboBox):
+    def wheelEvent(self, event):
+        event.ignore()
+
+
+# 📦 Модель таблицы: строки хранятся списками значений, виджеты не создаются
+class RobotTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []          # id робота для каждой строки
+        self._rows = []         # значения полей в порядке DB_FIELDS
+        self._row_by_id = {}    # id робота -> номер строки
+        self._dirty = {}        # id робота -> {поле: новое значение}
+        self.version = 0        # отметка синхронизации с сервером (см. db.get_robots_since), 0 — нет
+        self.read_only = False  # офлайн-режим: данные из снимка, правка запрещена
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(DB_FIELDS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return value
+        if role == Qt.BackgroundRole and index.column() == STATUS_COLUMN:
+            return self._status_brush(value)
+        if role == Qt.ToolTipRole and index.column() not in (MODEL_COLUMN, STATUS_COLUMN):
+            return value or None
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self.read_only:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        value = to_cell_text(value)
+        row = self._rows[index.row()]
+        if row[index.column()] == value:
+            return False
+        row[index.column()] = value
+        robot_id = self._ids[index.row()]
+        self._dirty.setdefault(robot_id, {})[DB_FIELDS[index.column()]] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.BackgroundRole])
+        return True
+
+    def _status_brush(self, status):
+        brush = _status_brushes.get(status)
+        if brush is None:
+            brush = QBrush(QColor(STATUS_COLORS.get(status, "#ffffff")))
+            _status_brushes[status] = brush
+        return brush
+
+    def set_read_only(self, read_only):
+        if self.read_only != read_only:
+            self.layoutAboutToBeChanged.emit()
+            self.read_only = read_only
+            self.layoutChanged.emit()
+
+    # 🔄 Полная замена данных модели; version — отметка синхронизации, если она известна
+    def load(self, robots, version=0):
+        self.beginResetModel()
+        self._ids = []
+        self._rows = []
+        self.version = version
+        for robot in robots:
+            self._ids.append(robot["id"])
+            self._rows.append([to_cell_text(robot.get(field)) for field in DB_FIELDS])
+        self._row_by_id = {robot_id: row for row, robot_id in enumerate(self._ids)}
+        self._dirty = {}
+        self.endResetModel()
+
+    # 🩹 Точечное применение изменений с сервера (строки из get_robots_since).
+    # Строки могут прийти повторно — применение идемпотентно
+    def apply_delta(self, robots, version):
+        self.version = version
+        removed = []
+        added = []
+        for robot in robots:
+            robot_id = robot["id"]
+            row = self._row_by_id.get(robot_id)
+            if robot.get("deleted"):
+                if row is not None:
+                    removed.append(row)
+                continue
+            values = [to_cell_text(robot.get(field)) for field in DB_FIELDS]
+            if row is None:
+                added.append((robot_id, values))
+                continue
+            # Несохранённые локальные правки не затираем. Сигнал — только по реально
+            # изменённым ячейкам: иначе открытый редактор в этой строке сбросится
+            dirty = self._dirty.get(robot_id, {})
+            current = self._rows[row]
+            for col, field in enumerate(DB_FIELDS):
+                if field not in dirty and current[col] != values[col]:
+                    current[col] = values[col]
+                    index = self.index(row, col)
+                    self.dataChanged.emit(index, index)
+
+        if removed:
+            for row in sorted(set(removed), reverse=True):
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self._dirty.pop(self._ids[row], None)
+                del self._ids[row]
+                del self._rows[row]
+                self.endRemoveRows()
+            self._row_by_id = {robot_id: row for row, robot_id in enumerate(self._ids)}
+
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for robot_id, values in added:
+                self._row_by_id[robot_id] = len(self._ids)
+                self._ids.append(robot_id)
+                self._rows.append(values)
+            self.endInsertRows()
+
+    def robot_id(self, row):
+        return self._ids[row]
+
+    def row_of(self, robot_id):
+        return self._row_by_id.get(robot_id)
+
+    def iter_rows(self):
+        return zip(self._ids, self._rows)
+
+    # Локальный поиск — для офлайн-режима, когда сервер недоступен
+    def matching_ids(self, text="", model=None, status=None):
+        text = text.lower()
+        ids = []
+        for robot_id, row in zip(self._ids, self._rows):
+            if model is not None and row[MODEL_COLUMN] != model:
+                continue
+            if status is not None and row[STATUS_COLUMN] != status:
+                continue
+            if text and not any(text in value.lower() for value in row):
+                continue
+            ids.append(robot_id)
+        return ids
+
+    # ✏️ Отслеживание изменённых ячеек
+    def has_changes(self):
+        return bool(self._dirty)
+
+    def dirty_changes(self):
+        return {robot_id: dict(fields) for robot_id, fields in self._dirty.items()}
+
+    def mark_saved(self, changes):
+        # Снимаем отметку только с тех ячеек, которые не правились повторно во время сохранения
+        for robot_id, fields in changes.items():
+            dirty = self._dirty.get(robot_id)
+            if dirty is None:
+                continue
+            for field, value in fields.items():
+                if dirty.get(field) == value:
+                    del dirty[field]
+            if not dirty:
+                del self._dirty[robot_id]
+
+
+# 🔍 Фильтр по набору id, найденных поиском на сервере
+class RobotFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._allowed_ids = None    # None — фильтр выключен
+
+    def is_filtered(self):
+        return self._allowed_ids is not None
+
+    def set_allowed_ids(self, ids):
+        self._allowed_ids = None if ids is None else set(ids)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._allowed_ids is None:
+            return True
+        return self.sourceModel().robot_id(source_row) in self._allowed_ids
+
+
+# 🧩 Редактор-выпадающий список, создаётся только для редактируемой ячейки
+class ComboBoxDelegate(QStyledItemDelegate):
+    def __init__(self, items, parent=None):
+        super().__init__(parent)
+        self.items = items
+
+    def createEditor(self, parent, option, index):
+        combo = NoScrollComboBox(parent)
+        combo.addItems(self.items)
+        combo.activated.connect(lambda _: self._commit_and_close(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        value = to_cell_text(index.data(Qt.EditRole))
+        if editor.findText(value) < 0:
+            editor.addItem(value)
+        editor.setCurrentText(value)
+        QTimer.singleShot(0, editor.showPopup)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+    def _commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor)
+
+
+# 📝 Многострочный редактор для текстовых полей
+class MultilineDelegate(QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        editor = QPlainTextEdit(parent)
+        editor.setLineWrapMode(QPlainTextEdit.WidgetWidth)
+        editor.setWordWrapMode(QTextOption.WordWrap)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setPlainText(to_cell_text(index.data(Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.toPlainText(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        rect = option.rect
+        rect.setHeight(max(rect.height(), 80))
+        editor.setGeometry(rect)
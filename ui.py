@@ -1,16 +1,23 @@
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
-    QWidget, QComboBox, QTableWidget, QVBoxLayout, QPushButton,
-    QPlainTextEdit, QMessageBox, QHBoxLayout, QLineEdit, QLabel
+    QWidget, QTableView, QVBoxLayout, QPushButton, QAbstractItemView, QComboBox,
+    QMessageBox, QHBoxLayout, QLineEdit, QLabel, QHeaderView, QProgressBar, QFileDialog
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QTextOption
-from db import get_all_robots, update_robot, add_robot, delete_robot
-from openpyxl import Workbook
-
-# 🔧 Кастомный ComboBox, отключающий прокрутку мыши
-class NoScrollComboBox(QComboBox):
-    def wheelEvent(self, event):
-        event.ignore()
+from db import (
+    init_db, get_dashboard, search_robots, update_robots, add_robot, delete_robot, is_connection_error
+)
+from cache import load_snapshot, fetch_all_robots, fetch_robots_since, fetch_lookups
+from table_model import (
+    MODELS, STATUSES, MODEL_COLUMN, STATUS_COLUMN,
+    RobotTableModel, RobotFilterProxyModel, ComboBoxDelegate, MultilineDelegate, set_lookups
+)
+from listener import ChangeListener
+from workers import DbExecutor
+from export import export_robots
+from importer import import_robots
+from stats_dialog import StatsDialog
+from dashboard import DashboardPanel, DASHBOARD_DAYS
+import instrument
 
 # 🧩 Основной класс интерфейса
 class RobotTable(QWidget):
@@ -19,199 +26,440 @@ class RobotTable(QWidget):
         self.setWindowTitle("Учёт роботов ОТК")
         self.resize(1000, 400)
 
-        # 🏷️ Заголовки таблицы и поля БД
-        self.headers = [
-            "Модель", "Серийный № робота", "Серийный № контроллера",
-            "Текущий статус", "Описание неисправности",
-            "Проблемный узел/модуль", "Причина поломки", "Проведенные работы",
-            "Планируемые работы", "Необходимые запчасти"
-        ]
-        self.db_fields = [
-            "model", "robot_sn", "controller_sn",
-            "status", "fault_description",
-            "fault_module", "fault_reason", "tasks_done",
-            "tasks_required", "required_parts"
-        ]
-        self.field_map = {i: field for i, field in enumerate(self.db_fields)}
+        # ⚙️ Все запросы к БД выполняются в фоновых потоках
+        self.executor = DbExecutor(self)
+        self.executor.activity_changed.connect(self.on_activity_changed)
+        self.executor.progress.connect(self.on_progress)
+        self.executor.error.connect(self.show_db_error)
+        self._search_generation = 0
+        self._schema_ready = False
+        self._full_resync = False    # следующая синхронизация перечитывает таблицу целиком
+        self.offline = False
 
         # 🔍 Поле поиска
         self.search_label = QLabel("Поиск:")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Введите текст...")
-        self.search_input.textChanged.connect(self.filter_table)
+
+        # Фильтры по модели и статусу
+        self.model_filter = QComboBox()
+        self.status_filter = QComboBox()
+        self.fill_filters()
+
+        # Поиск выполняется на сервере, после паузы в наборе текста
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.filter_table)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.model_filter.currentIndexChanged.connect(self.search_timer.start)
+        self.status_filter.currentIndexChanged.connect(self.search_timer.start)
 
         search_layout = QHBoxLayout()
         search_layout.addStretch()
+        search_layout.addWidget(self.model_filter)
+        search_layout.addWidget(self.status_filter)
         search_layout.addWidget(self.search_label)
         search_layout.addWidget(self.search_input)
 
-        # 📊 Таблица
-        self.table = QTableWidget()
+        # 📊 Таблица: модель + прокси для фильтрации + делегаты-редакторы
+        self.model = RobotTableModel(self)
+        self.proxy = RobotFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setWordWrap(True)
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked
+            | QAbstractItemView.EditKeyPressed | QAbstractItemView.AnyKeyPressed
+        )
+        self.text_delegate = MultilineDelegate(self.table)
+        self.model_delegate = ComboBoxDelegate(MODELS, self.table)
+        self.status_delegate = ComboBoxDelegate(STATUSES, self.table)
+        self.table.setItemDelegate(self.text_delegate)
+        self.table.setItemDelegateForColumn(MODEL_COLUMN, self.model_delegate)
+        self.table.setItemDelegateForColumn(STATUS_COLUMN, self.status_delegate)
+
+        # Фиксированные размеры: Qt не измеряет содержимое всех строк
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.verticalHeader().setDefaultSectionSize(50)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setDefaultSectionSize(160)
+        self.table.horizontalHeader().setStretchLastSection(True)
 
         # 🔘 Кнопки
         self.add_button = QPushButton("➕ Добавить робота")
         self.delete_button = QPushButton("🗑️ Удалить робота")
         self.save_button = QPushButton("💾 Сохранить изменения")
         self.export_button = QPushButton("📄 Экспорт в Excel")
+        self.import_button = QPushButton("📥 Импорт из Excel/CSV")
         self.refresh_button = QPushButton("🔄 Обновить таблицу")
+        self.stats_button = QPushButton("📊 Статистика")
 
         # 🔗 Привязка кнопок
         self.add_button.clicked.connect(self.add_robot)
         self.delete_button.clicked.connect(self.delete_robot)
         self.save_button.clicked.connect(self.save_changes)
         self.export_button.clicked.connect(self.export_to_excel)
-        self.refresh_button.clicked.connect(self.load_data)
+        self.import_button.clicked.connect(self.import_from_file)
+        self.refresh_button.clicked.connect(self.resync_all)
+        self.stats_button.clicked.connect(self.show_stats)
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.delete_button)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.import_button)
         button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.stats_button)
+
+        # ⏳ Строка состояния фоновых операций
+        self.status_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(250)
+        self.progress_bar.hide()
+        self.cancel_button = QPushButton("✖ Отмена")
+        self.cancel_button.clicked.connect(self.executor.cancel_all)
+        self.cancel_button.hide()
+
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        status_layout.addWidget(self.progress_bar)
+        status_layout.addWidget(self.cancel_button)
+
+        # ⚠️ Офлайн-режим: показываем локальный снимок, правка запрещена
+        self.offline_label = QLabel("⚠️ Нет связи с сервером — показаны данные из локального снимка, "
+                                    "только просмотр. Повторное подключение...")
+        self.offline_label.setStyleSheet("QLabel { background-color: #ffcccc; padding: 4px; }")
+        self.offline_label.hide()
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.setInterval(15000)
+        self.reconnect_timer.timeout.connect(self.sync_changes)
+
+        # 📈 Сводка по статусам над таблицей
+        self.dashboard = DashboardPanel()
 
         # 📐 Основной layout
         main_layout = QVBoxLayout()
+        main_layout.addWidget(self.offline_label)
+        main_layout.addWidget(self.dashboard)
         main_layout.addLayout(search_layout)
         main_layout.addWidget(self.table)
         main_layout.addLayout(button_layout)
+        main_layout.addLayout(status_layout)
 
         self.setLayout(main_layout)
         self.load_data()
 
-    # 🔍 Фильтрация таблицы по тексту
+        # 📡 Изменения с других станций: NOTIFY -> забираем только изменённые строки
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.setInterval(300)
+        self.sync_timer.timeout.connect(self.sync_changes)
+        self.listener = ChangeListener(self.executor, self)
+        self.listener.changed.connect(self.sync_timer.start)
+        self.listener.start()
+
+    def closeEvent(self, event):
+        self.listener.stop()
+        self.executor.cancel_all()
+        self.executor.pool.waitForDone(5000)
+        super().closeEvent(event)
+
+    # ⏳ Отображение фоновых операций
+    def on_activity_changed(self, titles, cancellable):
+        busy = bool(titles)
+        self.status_label.setText(f"⏳ {titles}..." if busy else "")
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        self.cancel_button.setEnabled(cancellable)
+        if busy:
+            self.progress_bar.setRange(0, 0)   # неопределённый прогресс до первого отчёта
+
+    def on_progress(self, done, total):
+        if total <= 0:
+            # Общее число неизвестно — показываем только счётчик
+            self.progress_bar.setRange(0, 0)
+            self.status_label.setText(f"⏳ Обработано строк: {done}")
+            return
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def show_db_error(self, title, error):
+        if is_connection_error(error):
+            self.set_offline(True)
+        QMessageBox.warning(self, "Ошибка базы данных", f"{title}: {error}")
+
+    def set_offline(self, offline):
+        self.offline = offline
+        self.model.set_read_only(offline)
+        self.offline_label.setVisible(offline)
+        for button in (self.add_button, self.delete_button, self.save_button, self.import_button):
+            button.setEnabled(not offline)
+        if offline:
+            self.reconnect_timer.start()
+
+    # 🔍 Фильтрация таблицы: поиск по индексу на сервере, в таблице остаются найденные id
     def filter_table(self):
-        query = self.search_input.text().lower()
-        for row in range(self.table.rowCount()):
-            match = False
-            for col in range(self.table.columnCount()):
-                widget = self.table.cellWidget(row, col)
-                if isinstance(widget, QComboBox):
-                    text = widget.currentText().lower()
-                elif isinstance(widget, QPlainTextEdit):
-                    text = widget.toPlainText().lower()
-                else:
-                    continue
-                if query in text:
-                    match = True
-                    break
-            self.table.setRowHidden(row, not match)
-
-    def create_model_cell(self, value):
-        combo = NoScrollComboBox()
-        combo.addItems(["RC3", "RC5", "RC10", "-"])
-        combo.setCurrentText(str(value))
-        return combo
-
-    def create_status_cell(self, value):
-        combo = NoScrollComboBox()
-        statuses = ["Необходим ремонт", "Тестируется", "Протестирован", "Откалиброван", "Упакован", "-"]
-        combo.addItems(statuses)
-        combo.setCurrentText(str(value))
-        self.update_status_color(combo, value)
-        combo.currentTextChanged.connect(lambda text: self.update_status_color(combo, text))
-        return combo
-
-    def update_status_color(self, combo, status):
-        color_map = {
-            "Необходим ремонт": "#ffcccc",     # светло-красный
-            "Откалиброван": "#ccffcc",         # светло-зелёный
-            "Тестируется": "#ffffcc",          # светло-жёлтый
-            "Протестирован": "#ccffff",        # светло-голубой
-            "Упакован": "#e0e0e0",             # серый
-            "-": "#ffffff"                     # белый
-        }
-
-        color = color_map.get(status, "#ffffff")
-        combo.setStyleSheet(f"QComboBox {{ background-color: {color}; }}")
-
-
-    def create_multiline_cell(self, value):
-        editor = QPlainTextEdit()
-        editor.setPlainText(str(value))
-        editor.setMaximumHeight(50)
-        editor.setLineWrapMode(QPlainTextEdit.WidgetWidth)
-        editor.setWordWrapMode(QTextOption.WordWrap)
-        return editor
+        self._search_generation += 1
+        generation = self._search_generation
+        text = self.search_input.text().strip()
+        model = self.model_filter.currentData()
+        status = self.status_filter.currentData()
+        if not text and model is None and status is None:
+            self.proxy.set_allowed_ids(None)
+            return
+        if self.offline:
+            with instrument.measure("ui.filter_table_local"):
+                self.proxy.set_allowed_ids(self.model.matching_ids(text, model, status))
+            return
+        token = instrument.start("ui.filter_table")
+
+        def apply(ids):
+            # Ответ на устаревший запрос не применяем
+            if generation == self._search_generation:
+                self.proxy.set_allowed_ids(ids)
+                instrument.finish(token, len(ids))
+        self.executor.submit("Поиск", search_robots, text, model, status,
+                             key="search", on_result=apply)
+
+    def fill_filters(self):
+        for combo, all_label, items in ((self.model_filter, "Все модели", MODELS),
+                                        (self.status_filter, "Все статусы", STATUSES)):
+            current = combo.currentData()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(all_label, None)
+            for item in items:
+                combo.addItem(item, item)
+            combo.setCurrentIndex(max(combo.findData(current), 0))
+            combo.blockSignals(False)
+
+    # 📚 Справочники моделей и статусов: загружаются один раз при подключении
+    def apply_lookups(self, lookups):
+        set_lookups(lookups)
+        self.fill_filters()
+        self.dashboard.refresh_layout()
+        self.table.viewport().update()
+
+    # 📈 Сводка считается на сервере: один запрос к сводным таблицам
+    def refresh_dashboard(self):
+        self.executor.submit("Сводка", get_dashboard, DASHBOARD_DAYS, key="dashboard", silent=True,
+                             on_result=self.dashboard.set_summary, on_error=lambda error: None)
 
+    # 💾 Сначала показываем локальный снимок, затем сверяемся с сервером
     def load_data(self):
-        self.table.blockSignals(True)
-        robots = get_all_robots()
-        robots.sort(key=lambda x: x['id'])
-
-        self.table.setColumnCount(len(self.headers))
-        self.table.setHorizontalHeaderLabels(self.headers)
-        self.table.setRowCount(len(robots))
-
-        for row_idx, robot in enumerate(robots):
-            for col_idx, field in enumerate(self.db_fields):
-                value = robot.get(field, "")
-                if field == "model":
-                    self.table.setCellWidget(row_idx, col_idx, self.create_model_cell(value))
-                elif field == "status":
-                    self.table.setCellWidget(row_idx, col_idx, self.create_status_cell(value))
-                else:
-                    self.table.setCellWidget(row_idx, col_idx, self.create_multiline_cell(value))
+        token = instrument.start("ui.load_snapshot")
 
-        self.table.setWordWrap(True)
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
-        self.table.blockSignals(False)
+        def loaded(snapshot):
+            robots, version, lookups = snapshot
+            if lookups is not None:
+                self.apply_lookups(lookups)
+            with instrument.measure("ui.model_load", len(robots)):
+                self.model.load(robots, version)
+            instrument.finish(token, len(robots))
+            self.sync_changes()
+        self.executor.submit("Загрузка снимка", load_snapshot, key="rows",
+                             on_result=loaded, on_error=lambda error: self.sync_changes())
+
+    # 🔄 Полное перечитывание таблицы по кнопке «Обновить»
+    def resync_all(self):
+        if self.model.has_changes():
+            reply = QMessageBox.question(self, "Несохранённые данные",
+                                         "Несохранённые изменения будут потеряны. Обновить таблицу?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        self._full_resync = True
+        self.sync_changes()
+
+    # 🔄 Инкрементальное обновление: строки, изменённые после отметки синхронизации
+    def sync_changes(self):
+        def fetch():
+            lookups = None
+            if not self._schema_ready:
+                init_db()
+                lookups = fetch_lookups()
+                self._schema_ready = True
+            # Отметка читается при запуске задачи, чтобы отложенный запрос учёл предыдущий ответ
+            version = self.model.version
+            if version == 0 or self._full_resync:
+                return (True, *fetch_all_robots(), lookups)
+            return (False, *fetch_robots_since(version), lookups)
+        token = instrument.start("ui.sync_changes")
+
+        def synced(result):
+            self.on_synced(result)
+            instrument.finish(token, len(result[1]))
+        self.executor.submit("Обновление", fetch, key="rows",
+                             on_result=synced, on_error=self.on_sync_failed)
+
+    def on_synced(self, result):
+        full, robots, version, lookups = result
+        if self.offline:
+            self.set_offline(False)
+        if lookups is not None:
+            self.apply_lookups(lookups)
+        # Сводку обновляем при первом подключении и после любых изменений
+        if full or robots or lookups is not None:
+            self.refresh_dashboard()
+        if full:
+            self._full_resync = False
+            with instrument.measure("ui.model_load", len(robots)):
+                self.model.load(robots, version)
+            if self.proxy.is_filtered():
+                self.search_timer.start()
+        else:
+            self.apply_changes(robots, version)
+
+    def on_sync_failed(self, error):
+        if is_connection_error(error):
+            self.set_offline(True)
+        else:
+            self.show_db_error("Обновление", error)
+
+    def apply_changes(self, robots, version):
+        with instrument.measure("ui.apply_delta", len(robots)):
+            self.model.apply_delta(robots, version)
+        # Изменённые строки могли начать или перестать подходить под поиск
+        if robots and self.proxy.is_filtered():
+            self.search_timer.start()
+
+    # id робота в текущей строке таблицы (с учётом фильтра)
+    def current_robot_id(self):
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.model.robot_id(self.proxy.mapToSource(index).row())
 
     def add_robot(self):
-        reply = QMessageBox.question(self, "Несохранённые данные",
-            "Вы хотите сохранить изменения перед добавлением нового робота?",
-            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+        if self.model.has_changes():
+            reply = QMessageBox.question(self, "Несохранённые данные",
+                "Вы хотите сохранить изменения перед добавлением нового робота?",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
 
-        if reply == QMessageBox.Cancel:
-            return
-        elif reply == QMessageBox.Yes:
-            self.save_changes()
+            if reply == QMessageBox.Cancel:
+                return
+            elif reply == QMessageBox.Yes:
+                self.save_changes()
 
-        add_robot()
-        self.load_data()
+        self.executor.submit("Добавление робота", add_robot,
+                             on_result=lambda robot_id: self.sync_changes())
 
     def delete_robot(self):
-        selected = self.table.currentRow()
-        if selected < 0:
+        robot_id = self.current_robot_id()
+        if robot_id is None:
             return
-        robot_id = get_all_robots()[selected]['id']
         reply = QMessageBox.question(self, "Подтверждение удаления",
                                      f"Удалить робота с ID {robot_id}?",
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            delete_robot(robot_id)
-            self.load_data()
+            self.executor.submit("Удаление робота", delete_robot, robot_id,
+                                 on_result=lambda _: self.sync_changes())
 
     def save_changes(self):
+        if not self.model.has_changes():
+            QMessageBox.information(self, "Готово", "Нет несохранённых изменений.")
+            return
         reply = QMessageBox.question(self, "Подтверждение",
                                      "Сохранить все изменения?",
                                      QMessageBox.Yes | QMessageBox.No)
         if reply != QMessageBox.Yes:
             return
-        robots = get_all_robots()
-        for row in range(self.table.rowCount()):
-            robot_id = robots[row]['id']
-            for col in range(self.table.columnCount()):
-                field = self.db_fields[col]
-                widget = self.table.cellWidget(row, col)
-                if isinstance(widget, QComboBox):
-                    value = widget.currentText()
-                elif isinstance(widget, QPlainTextEdit):
-                    value = widget.toPlainText()
-                else:
-                    continue
-                update_robot(robot_id, field, value)
-        QMessageBox.information(self, "Готово", "✅ Изменения сохранены.")
-        self.load_data()
+        # Отправляем только изменённые ячейки одним запросом
+        changes = self.model.dirty_changes()
+        token = instrument.start("ui.save_changes")
+
+        def saved(_):
+            self.model.mark_saved(changes)
+            instrument.finish(token, len(changes))
+            QMessageBox.information(self, "Готово", "✅ Изменения сохранены.")
+        self.executor.submit("Сохранение", update_robots, changes, key="save", on_result=saved)
+
+    # id видимых (отфильтрованных) строк
+    def filtered_robot_ids(self):
+        return [self.model.robot_id(self.proxy.mapToSource(self.proxy.index(row, 0)).row())
+                for row in range(self.proxy.rowCount())]
+
+    # id строк, в которых выделена хотя бы одна ячейка
+    def selected_robot_ids(self):
+        rows = {self.proxy.mapToSource(index).row()
+                for index in self.table.selectionModel().selectedIndexes()}
+        return [self.model.robot_id(row) for row in sorted(rows)]
+
+    # Какие строки выгружать: None — все, иначе список id; False — отмена
+    def ask_export_scope(self):
+        selected = self.selected_robot_ids()
+        filtered = self.proxy.is_filtered()
+        if not selected and not filtered:
+            return None
+        box = QMessageBox(self)
+        box.setWindowTitle("Экспорт")
+        box.setText("Какие строки выгрузить?")
+        all_button = box.addButton("Все", QMessageBox.AcceptRole)
+        filtered_button = box.addButton("Отфильтрованные", QMessageBox.AcceptRole) if filtered else None
+        selected_button = box.addButton("Выделенные", QMessageBox.AcceptRole) if selected else None
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        clicked = box.clickedButton()
+        if clicked is all_button:
+            return None
+        if filtered_button is not None and clicked is filtered_button:
+            return self.filtered_robot_ids()
+        if selected_button is not None and clicked is selected_button:
+            return selected
+        return False
 
     def export_to_excel(self):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Роботы ОТК"
-        ws.append(self.headers)
-        robots = get_all_robots()
-        for robot in robots:
-            row_data = [robot.get(field, "") for field in self.db_fields]
-            ws.append(row_data)
-        wb.save("robots_export.xlsx")
-        print("✅ Данные успешно экспортированы в robots_export.xlsx")
+        ids = self.ask_export_scope()
+        if ids is False:
+            return
+        path, file_filter = QFileDialog.getSaveFileName(
+            self, "Экспорт", "robots_export.xlsx", "Excel (*.xlsx);;CSV (*.csv)")
+        if not path:
+            return
+        extension = ".csv" if file_filter.startswith("CSV") else ".xlsx"
+        if not path.lower().endswith((".xlsx", ".csv")):
+            path += extension
+        self.start_export(path, ids)
+
+    def start_export(self, path, ids=None):
+        total = len(ids) if ids is not None else self.model.rowCount()
+        token = instrument.start("ui.export")
+
+        def exported(path):
+            instrument.finish(token, total)
+            QMessageBox.information(self, "Готово", f"✅ Данные успешно экспортированы в {path}")
+        self.executor.submit("Экспорт", export_robots, path, ids, total,
+                             key="export", with_task=True, on_result=exported)
+
+    def import_from_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт роботов", "", "Таблицы (*.xlsx *.csv);;Excel (*.xlsx);;CSV (*.csv)")
+        if not path:
+            return
+
+        token = instrument.start("ui.import")
+
+        def imported(report):
+            instrument.finish(token, report.rows_read)
+            lines = [
+                f"Прочитано строк: {report.rows_read}",
+                f"Добавлено: {report.inserted}",
+                f"Обновлено: {report.updated}",
+                f"Пропущено с ошибками: {report.error_count}",
+            ]
+            lines += [f"Строка {line_no}: {message}" for line_no, message in report.errors[:20]]
+            if report.error_count > 20:
+                lines.append("...")
+            QMessageBox.information(self, "Импорт завершён", "\n".join(lines))
+            self.sync_changes()
+        self.executor.submit("Импорт", import_robots, path,
+                             key="import", with_task=True, on_result=imported)
+
+    def show_stats(self):
+        StatsDialog(self).exec_()
@@ -0,0 +1,159 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from db import POOL_MAX_CONNECTIONS
+
+
+# 🛑 Состояние задачи, доступное выполняемой функции (параметр task=)
+class TaskContext:
+    def __init__(self, signals):
+        self._signals = signals
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def report_progress(self, done, total):
+        self._signals.progress.emit(done, total)
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+
+
+# 🧵 Обёртка функции для выполнения в пуле потоков
+class DbTask(QRunnable):
+    def __init__(self, title, fn, args, kwargs, with_task):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.title = title
+        self.signals = WorkerSignals()
+        self.context = TaskContext(self.signals)
+        self.with_task = with_task
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def run(self):
+        if self.context.is_cancelled():
+            self.signals.failed.emit(TaskCancelled())
+            return
+        kwargs = dict(self._kwargs)
+        if self.with_task:
+            kwargs["task"] = self.context
+        try:
+            result = self._fn(*self._args, **kwargs)
+        except Exception as error:
+            self.signals.failed.emit(error)
+        else:
+            self.signals.finished.emit(result)
+
+
+# ⚙️ Выполнение операций с БД вне GUI-потока; результаты приходят через сигналы
+class DbExecutor(QObject):
+    activity_changed = pyqtSignal(str, bool)   # описание текущих задач, можно ли отменить
+    progress = pyqtSignal(int, int)
+    error = pyqtSignal(str, object)            # заголовок задачи, исключение
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        # Потоков не больше, чем соединений в пуле БД
+        self.pool.setMaxThreadCount(POOL_MAX_CONNECTIONS)
+        self._active = []     # выполняемые и ожидающие задачи
+        self._running = {}    # ключ -> задача, для объединения повторных запросов
+        self._pending = {}    # ключ -> аргументы submit, которые ждут окончания текущей задачи
+
+    def submit(self, title, fn, *args, on_result=None, on_error=None, key=None,
+               with_task=False, silent=False, **kwargs):
+        """Запускает fn(*args, **kwargs) в пуле потоков.
+
+        on_result/on_error вызываются в GUI-потоке. Если задача с тем же key
+        уже выполняется, запрос откладывается до её окончания; из нескольких
+        отложенных выполняется только последний. with_task=True передаёт в fn параметр task
+        (отмена и прогресс). silent=True не показывает задачу в строке состояния.
+        """
+        if key is not None and key in self._running:
+            self._pending[key] = (title, fn, args, kwargs, on_result, on_error, with_task, silent)
+            return None
+
+        task = DbTask(title, fn, args, kwargs, with_task)
+        task.silent = silent
+        task.signals.finished.connect(lambda result: self._on_finished(task, key, result, on_result))
+        task.signals.failed.connect(lambda error: self._on_failed(task, key, error, on_error))
+        if not silent:
+            task.signals.progress.connect(self.progress)
+        if key is not None:
+            self._running[key] = task
+        self._active.append(task)
+        self._emit_activity()
+        self.pool.start(task)
+        return task
+
+    def cancel_all(self):
+        for task in list(self._active):
+            if task.silent:
+                continue
+            if self.pool.tryTake(task):
+                # Задача ещё не стартовала и снята с очереди — завершаем вручную
+                task.context.cancel()
+                task.signals.failed.emit(TaskCancelled())
+            elif task.with_task:
+                task.context.cancel()
+
+    def is_busy(self):
+        return any(not task.silent for task in self._active)
+
+    def is_idle(self):
+        # В отличие от is_busy учитывает и фоновые (silent) задачи
+        return not self._active and not self._pending and self.pool.activeThreadCount() == 0
+
+    def _finish(self, task, key):
+        if task in self._active:
+            self._active.remove(task)
+        if key is not None and self._running.get(key) is task:
+            del self._running[key]
+        self._emit_activity()
+
+    def _start_pending(self, key):
+        # Отложенный запрос запускается после того, как результат предыдущего уже применён
+        pending = self._pending.pop(key, None) if key is not None else None
+        if pending is not None:
+            title, fn, args, kwargs, on_result, on_error, with_task, silent = pending
+            self.submit(title, fn, *args, on_result=on_result, on_error=on_error, key=key,
+                        with_task=with_task, silent=silent, **kwargs)
+
+    def _on_finished(self, task, key, result, on_result):
+        self._finish(task, key)
+        try:
+            if on_result is not None and not task.context.is_cancelled():
+                on_result(result)
+        finally:
+            self._start_pending(key)
+
+    def _on_failed(self, task, key, error, on_error):
+        self._finish(task, key)
+        try:
+            if isinstance(error, TaskCancelled) or task.context.is_cancelled():
+                return
+            if on_error is not None:
+                on_error(error)
+            else:
+                self.error.emit(task.title, error)
+        finally:
+            self._start_pending(key)
+
+    def _emit_activity(self):
+        visible = [task for task in self._active if not task.silent]
+        titles = ", ".join(dict.fromkeys(task.title for task in visible))
+        self.activity_changed.emit(titles, any(task.with_task for task in visible))